@@ -1,5 +1,5 @@
 import asyncio
-from python.helpers import runtime, whisper, settings
+from python.helpers import runtime, whisper, settings, tokens, files
 from python.helpers.print_style import PrintStyle
 from python.helpers import kokoro_tts
 import models
@@ -37,9 +37,25 @@ async def preload():
                 except Exception as e:
                     PrintStyle().error(f"Error in preload_kokoro: {e}")
 
+        # preload tokenizer used for exact token counts
+        async def preload_tokenizer():
+            try:
+                return await asyncio.to_thread(tokens.preload_encoding)
+            except Exception as e:
+                PrintStyle().error(f"Error in preload_tokenizer: {e}")
+
+        # remove what failed directory deletions left behind, off the event loop
+        async def sweep_trash():
+            try:
+                return await asyncio.to_thread(files.sweep_trash)
+            except Exception as e:
+                PrintStyle().error(f"Error in sweep_trash: {e}")
+
         # async tasks to preload
         tasks = [
             preload_embedding(),
+            preload_tokenizer(),
+            sweep_trash(),
             # preload_whisper(),
             # preload_kokoro()
         ]
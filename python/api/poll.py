@@ -1,10 +1,38 @@
 from python.helpers.api import ApiHandler, Request, Response
 
-from agent import AgentContext, AgentContextType
+import heapq
 
-from python.helpers.task_scheduler import TaskScheduler
+from agent import AgentContext, AgentContextType, EPOCH
+
+from python.helpers.task_scheduler import TaskScheduler, serialize_task
 from python.helpers.localization import Localization
-from python.helpers.dotenv import get_dotenv_value
+from python.helpers import dotenv
+
+
+# type-specific task field merged into the task context data
+_TASK_TYPE_FIELDS = {"scheduled": "schedule", "planned": "plan"}
+
+
+# (dotenv generation, cap) of the last MAX_CONTEXTS_PER_POLL read
+_max_contexts_cache: tuple[int, int] | None = None
+
+
+def _get_max_contexts() -> int:
+    # optional cap on the contexts returned per poll, 0 (or an invalid value) means no cap;
+    # parsed again only after .env is reloaded, not on every poll
+    global _max_contexts_cache
+    generation = dotenv.get_dotenv_generation()
+    if _max_contexts_cache is None or _max_contexts_cache[0] != generation:
+        try:
+            value = max(0, int(dotenv.get_dotenv_value("MAX_CONTEXTS_PER_POLL", 0) or 0))
+        except (TypeError, ValueError):
+            value = 0
+        _max_contexts_cache = (generation, value)
+    return _max_contexts_cache[1]
+
+
+def _ctx_key(ctx: AgentContext):
+    return ctx.created_at or EPOCH
 
 
 class Poll(ApiHandler):
@@ -14,9 +42,11 @@ class Poll(ApiHandler):
         from_no = input.get("log_from", 0)
         notifications_from = input.get("notifications_from", 0)
 
-        # Get timezone from input (default to dotenv default or UTC if not provided)
-        timezone = input.get("timezone", get_dotenv_value("DEFAULT_USER_TIMEZONE", "UTC"))
-        Localization.get().set_timezone(timezone)
+        # Get timezone from input; when not provided keep the current one, which is
+        # already initialized from the persisted DEFAULT_USER_TIMEZONE (or UTC)
+        timezone = input.get("timezone")
+        if timezone:
+            Localization.get().set_timezone(timezone)
 
         # context instance - get or create only if ctxid is provided
         if ctxid:
@@ -46,78 +76,83 @@ class Poll(ApiHandler):
 
         ctxs = []
         tasks = []
-        processed_contexts = set()  # Track processed context IDs
 
-        all_ctxs = list(AgentContext._contexts.values())
+        # Index task-dedicated contexts once instead of scanning the task list for every context
+        tasks_by_context_id = {
+            task.context_id: task
+            for task in scheduler.get_tasks()
+            if task.is_dedicated()
+        }
+
+        # Newest contexts first; when MAX_CONTEXTS_PER_POLL is set only the newest N are
+        # selected (O(N log K)) instead of sorting the whole list
+        # BACKGROUND contexts are skipped before sorting as they should be invisible to users
+        visible_ctxs = (
+            ctx
+            for ctx in AgentContext._contexts.values()
+            if ctx.type != AgentContextType.BACKGROUND
+        )
+        max_contexts = _get_max_contexts()
+        if max_contexts > 0:
+            all_ctxs = heapq.nlargest(max_contexts, visible_ctxs, key=_ctx_key)
+            # the active context is always listed, even when older than the newest N
+            if (
+                context
+                and context.type != AgentContextType.BACKGROUND
+                and context not in all_ctxs
+            ):
+                all_ctxs.append(context)
+                all_ctxs.sort(key=_ctx_key, reverse=True)
+        else:
+            all_ctxs = sorted(visible_ctxs, key=_ctx_key, reverse=True)
+
+        # local aliases for the per-context loop
+        get_task = tasks_by_context_id.get
+        get_type_field = _TASK_TYPE_FIELDS.get
+        append_ctx = ctxs.append
+        append_task = tasks.append
+
         # First, identify all tasks
         for ctx in all_ctxs:
-            # Skip if already processed
-            if ctx.id in processed_contexts:
-                continue
-
-            # Skip BACKGROUND contexts as they should be invisible to users
-            if ctx.type == AgentContextType.BACKGROUND:
-                processed_contexts.add(ctx.id)
-                continue
-
-            # Create the base context data that will be returned
-            context_data = ctx.output()
-
-            context_task = scheduler.get_task_by_uuid(ctx.id)
-            # Determine if this is a task-dedicated context by checking if a task with this UUID exists
-            is_task_context = (
-                context_task is not None and context_task.context_id == ctx.id
-            )
-
-            if not is_task_context:
-                ctxs.append(context_data)
+            # Determine if this is a task-dedicated context (task.uuid == task.context_id == ctx.id)
+            context_task = get_task(ctx.id)
+
+            if context_task is None:
+                append_ctx(ctx.output())
             else:
-                # If this is a task, get task details from the scheduler
-                task_details = scheduler.serialize_task(ctx.id)
-                if task_details:
-                    # Add task details to context_data with the same field names
-                    # as used in scheduler endpoints to maintain UI compatibility
-                    context_data.update({
-                        "task_name": task_details.get("name"),  # name is for context, task_name for the task name
-                        "uuid": task_details.get("uuid"),
-                        "state": task_details.get("state"),
-                        "type": task_details.get("type"),
-                        "system_prompt": task_details.get("system_prompt"),
-                        "prompt": task_details.get("prompt"),
-                        "last_run": task_details.get("last_run"),
-                        "last_result": task_details.get("last_result"),
-                        "attachments": task_details.get("attachments", []),
-                        "context_id": task_details.get("context_id"),
-                    })
-
-                    # Add type-specific fields
-                    if task_details.get("type") == "scheduled":
-                        context_data["schedule"] = task_details.get("schedule")
-                    elif task_details.get("type") == "planned":
-                        context_data["plan"] = task_details.get("plan")
-                    else:
-                        context_data["token"] = task_details.get("token")
-
-                tasks.append(context_data)
-
-            # Mark as processed
-            processed_contexts.add(ctx.id)
-
-        # Sort tasks and chats by their creation date, descending
-        ctxs.sort(key=lambda x: x["created_at"], reverse=True)
-        tasks.sort(key=lambda x: x["created_at"], reverse=True)
+                # Add task details to the context data with the same field names
+                # as used in scheduler endpoints to maintain UI compatibility
+                td = serialize_task(context_task)
+                task_type = td.get("type")
+                # Add the type-specific field
+                type_field = get_type_field(task_type, "token")
+                append_task({
+                    **ctx.output(),
+                    "task_name": td.get("name"),  # name is for context, task_name for the task name
+                    "uuid": td.get("uuid"),
+                    "state": td.get("state"),
+                    "type": task_type,
+                    "system_prompt": td.get("system_prompt"),
+                    "prompt": td.get("prompt"),
+                    "last_run": td.get("last_run"),
+                    "last_result": td.get("last_result"),
+                    "attachments": td.get("attachments", []),
+                    "context_id": td.get("context_id"),
+                    type_field: td.get(type_field),
+                })
 
         # data from this server
+        log = context.log if context else None
         return {
             "deselect_chat": ctxid and not context,
             "context": context.id if context else "",
             "contexts": ctxs,
             "tasks": tasks,
             "logs": logs,
-            "log_guid": context.log.guid if context else "",
-            "log_version": len(context.log.updates) if context else 0,
-            "log_progress": context.log.progress if context else 0,
-            "log_progress_active": context.log.progress_active if context else False,
+            "log_guid": log.guid if log else "",
+            "log_version": len(log.updates) if log else 0,
+            "log_progress": log.progress if log else 0,
+            "log_progress_active": log.progress_active if log else False,
             "paused": context.paused if context else False,
             "notifications": notifications,
             "notifications_guid": notification_manager.guid,
@@ -1,6 +1,7 @@
 from abc import abstractmethod
 import json
 import threading
+import orjson
 from typing import Union, TypedDict, Dict, Any
 from attr import dataclass
 from flask import Request, Response, jsonify, Flask, session, request, send_file
@@ -68,7 +69,11 @@ class ApiHandler:
             if isinstance(output, Response):
                 return output
             else:
-                response_json = json.dumps(output)
+                try:
+                    response_json = orjson.dumps(output, option=orjson.OPT_NON_STR_KEYS)
+                except TypeError:
+                    # fall back for values orjson does not support (e.g. ints beyond 64 bits)
+                    response_json = json.dumps(output)
                 return Response(
                     response=response_json, status=200, mimetype="application/json"
                 )
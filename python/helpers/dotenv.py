@@ -10,8 +10,19 @@ KEY_AUTH_PASSWORD = "AUTH_PASSWORD"
 KEY_RFC_PASSWORD = "RFC_PASSWORD"
 KEY_ROOT_PASSWORD = "ROOT_PASSWORD"
 
+# bumped on every reload of .env into the environment, so values derived from dotenv
+# settings can be cached until the next change
+_generation = 0
+
+
 def load_dotenv():
+    global _generation
     _load_dotenv(get_dotenv_file_path(), override=True)
+    _generation += 1
+
+
+def get_dotenv_generation() -> int:
+    return _generation
 
 
 def get_dotenv_file_path():
@@ -22,21 +33,29 @@ def get_dotenv_value(key: str, default: Any = None):
     return os.getenv(key, default)
 
 def save_dotenv_value(key: str, value: str):
-    if value is None:
-        value = ""
+    save_dotenv_values({key: value})
+
+
+def save_dotenv_values(values: dict[str, str]):
+    # apply all updates with a single read and rewrite of the file and a single reload
+    if not values:
+        return
     dotenv_path = get_dotenv_file_path()
     if not os.path.isfile(dotenv_path):
         with open(dotenv_path, "w") as f:
             f.write("")
     with open(dotenv_path, "r+") as f:
         lines = f.readlines()
-        found = False
-        for i, line in enumerate(lines):
-            if re.match(rf"^\s*{key}\s*=", line):
-                lines[i] = f"{key}={value}\n"
-                found = True
-        if not found:
-            lines.append(f"\n{key}={value}\n")
+        for key, value in values.items():
+            if value is None:
+                value = ""
+            found = False
+            for i, line in enumerate(lines):
+                if re.match(rf"^\s*{key}\s*=", line):
+                    lines[i] = f"{key}={value}\n"
+                    found = True
+            if not found:
+                lines.append(f"\n{key}={value}\n")
         f.seek(0)
         f.writelines(lines)
         f.truncate()
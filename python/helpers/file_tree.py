@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from collections import deque
+import heapq
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 import os
+import re
 from typing import Any, Callable, Iterable, Literal, Optional, Sequence
 
 from pathspec import PathSpec
@@ -104,6 +107,8 @@ def file_tree(
 
     need_created = output_mode != OUTPUT_MODE_STRING or sort_key == SORT_BY_CREATED
     need_modified = output_mode != OUTPUT_MODE_STRING or sort_key == SORT_BY_MODIFIED
+    need_stat = need_created or need_modified
+    sort_times = sort_key != SORT_BY_NAME
 
     root_stat = os.stat(abs_root, follow_symlinks=False)
     root_name = os.path.basename(os.path.normpath(abs_root)) or os.path.basename(
@@ -113,43 +118,39 @@ def file_tree(
         name=root_name,
         level=0,
         item_type="folder",
-        created=datetime.fromtimestamp(root_stat.st_ctime, tz=timezone.utc)
-        if need_created
-        else None,
-        modified=datetime.fromtimestamp(root_stat.st_mtime, tz=timezone.utc)
-        if need_modified
-        else None,
+        created=root_stat.st_ctime if need_created else None,
+        modified=root_stat.st_mtime if need_modified else None,
         parent=None,
-        items=[],
+        items=None,
         rel_path="",
     )
 
     queue: deque[tuple[_TreeEntry, str, int]] = deque([(root_node, abs_root, 1)])
-    nodes_in_order: list[_TreeEntry] = []
     rendered_count = 0
     limit_reached = False
-    visibility_cache: dict[str, bool] = {}
+    scan_cache = _ScanCache()
 
     def make_entry(
-        entry: os.DirEntry,
-        rel_path: str,
+        candidate: _Candidate,
         parent: _TreeEntry,
         level: int,
         item_type: Literal["file", "folder"],
     ) -> _TreeEntry:
-        stat = entry.stat(follow_symlinks=False)
+        entry, rel_path, times = candidate
+        # Only stat when timestamps are needed (structured output or time-based sort);
+        # a time-based sort has already read them while ranking the candidates
+        if times is None:
+            times = _entry_times(entry) if need_stat else (0.0, 0.0)
+        ctime, mtime = times
         return _TreeEntry(
             name=entry.name,
             level=level,
             item_type=item_type,
-            created=datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc)
-            if need_created
-            else None,
-            modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
-            if need_modified
-            else None,
+            created=ctime if need_created else None,
+            modified=mtime if need_modified else None,
             parent=parent,
-            items=[] if item_type == "folder" else None,
+            # children are attached only once they are known to be rendered
+            items=None,
             rel_path=rel_path,
         )
 
@@ -165,25 +166,21 @@ def file_tree(
             parent_node.rel_path,
             ignore_spec,
             max_depth_remaining=remaining_depth,
-            cache=visibility_cache,
+            cache=scan_cache,
         )
 
-        folder_entries = [
-            make_entry(folder, rel_path, parent_node, level, "folder")
-            for folder, rel_path in folders
-        ]
-        file_entries = [
-            make_entry(file_entry, rel_path, parent_node, level, "file")
-            for file_entry, rel_path in files
-        ]
-
+        # entries are ranked straight from the scandir results; a _TreeEntry is only
+        # allocated for the candidates that survive max_folders/max_files
         children = _apply_sorting_and_limits(
-            folder_entries,
-            file_entries,
+            _make_candidates(folders, sort_times),
+            _make_candidates(files, sort_times),
             folders_first=folders_first,
             sort=sort,
             max_folders=max_folders,
             max_files=max_files,
+            make_entry=lambda candidate, item_type: make_entry(
+                candidate, parent_node, level, item_type
+            ),
             directory_node=parent_node,
         )
 
@@ -199,7 +196,6 @@ def file_tree(
                     hidden_children_local = children[index:]
                     break
                 trimmed_children.append(child)
-                nodes_in_order.append(child)
                 is_global_summary = (
                     child.item_type == "comment"
                     and child.rel_path.endswith("#summary:limit")
@@ -212,7 +208,6 @@ def file_tree(
                     hidden_children_local,
                 )
                 trimmed_children.append(summary)
-                nodes_in_order.append(summary)
 
         parent_node.items = trimmed_children or None
 
@@ -235,38 +230,25 @@ def file_tree(
             summary = _create_folder_unprocessed_comment(
                 folder_node,
                 folder_path,
-                abs_root,
                 ignore_spec,
+                scan_cache,
             )
             if summary is None:
                 continue
             folder_node.items = (folder_node.items or []) + [summary]
-            nodes_in_order.append(summary)
-
-    visible_nodes = nodes_in_order
 
-    visible_ids = {id(node) for node in visible_nodes}
-    if visible_ids:
-        _prune_to_visible(root_node, visible_ids)
-
-    _mark_last_flags(root_node)
-    _refresh_render_metadata(root_node)
-
-    def iter_visible() -> Iterable[_TreeEntry]:
-        for node in _iter_depth_first(root_node.items or []):
-            if not visible_ids or id(node) in visible_ids:
-                yield node
+    _finalize_tree(root_node)
 
     if output_mode == OUTPUT_MODE_STRING:
         display_name = relative_path.strip() or root_name
         root_line = f"{display_name.rstrip(os.sep)}/"
         lines = [root_line]
-        for node in iter_visible():
+        for node in _iter_depth_first(root_node.items or []):
             lines.append(node.text)
         return "\n".join(lines)
 
     if output_mode == OUTPUT_MODE_FLAT:
-        return _build_tree_items_flat(list(iter_visible()))
+        return _build_tree_items_flat(list(_iter_depth_first(root_node.items or [])))
 
     return _to_nested_structure(root_node.items or [])
 
@@ -276,8 +258,9 @@ class _TreeEntry:
     name: str
     level: int
     item_type: Literal["file", "folder", "comment"]
-    created: Optional[datetime]
-    modified: Optional[datetime]
+    # raw epoch timestamps, converted to datetime only at the output boundary
+    created: Optional[float]
+    modified: Optional[float]
     parent: Optional["_TreeEntry"] = None
     items: Optional[list["_TreeEntry"]] = None
     is_last: bool = False
@@ -285,17 +268,12 @@ class _TreeEntry:
     text: str = ""
 
     def as_dict(self) -> dict[str, Any]:
-        return {
-            "name": self.name,
-            "level": self.level,
-            "type": self.item_type,
-            "created": self.created,
-            "modified": self.modified,
-            "text": self.text,
-            "items": [child.as_dict() for child in self.items]
-            if self.items is not None
-            else None,
-        }
+        return _to_nested_structure([self])[0]
+
+
+def _entry_times(entry: os.DirEntry) -> tuple[float, float]:
+    stat = entry.stat(follow_symlinks=False)
+    return stat.st_ctime, stat.st_mtime
 
 
 def _normalize_relative_path(path: str) -> str:
@@ -307,62 +285,79 @@ def _normalize_relative_path(path: str) -> str:
     return normalized
 
 
+class _ScanCache:
+    """Per-call scan state shared by directory listings and visibility probes.
+
+    ``listings`` holds directories already read by a visibility probe, so a probed
+    directory that turns out to be visible is not scanned a second time when it is listed.
+    """
+
+    __slots__ = ("visible", "listings")
+
+    def __init__(self):
+        self.visible: dict[str, bool] = {}
+        self.listings: dict[str, list[tuple[os.DirEntry, bool]]] = {}
+
+
+def _scan_directory(directory: str) -> list[tuple[os.DirEntry, bool]]:
+    with os.scandir(directory) as iterator:
+        return [(entry, entry.is_dir(follow_symlinks=False)) for entry in iterator]
+
+
 def _directory_has_visible_entries(
     directory: str,
     dir_rel_path: str,
-    ignore_spec: PathSpec,
-    cache: dict[str, bool],
+    ignore_spec: _IgnoreMatcher,
+    cache: _ScanCache,
     max_depth_remaining: int,
 ) -> bool:
     if max_depth_remaining == 0:
         return False
 
-    cached = cache.get(directory)
+    # Without negated patterns nothing below an ignored directory can be re-included,
+    # so there is no need to scan the subtree (e.g. every __pycache__/ or node_modules/)
+    if not ignore_spec.can_reinclude:
+        return False
+
+    visible = cache.visible
+    cached = visible.get(directory)
     if cached is not None:
         return cached
 
     try:
-        with os.scandir(directory) as iterator:
-            for entry in iterator:
-                # Optimization: Manual path construction
-                if dir_rel_path:
-                    rel_posix = f"{dir_rel_path}/{entry.name}"
-                else:
-                    rel_posix = entry.name
-
-                is_dir = entry.is_dir(follow_symlinks=False)
-
-                if is_dir:
-                    ignored = ignore_spec.match_file(rel_posix) or ignore_spec.match_file(
-                        f"{rel_posix}/"
-                    )
-                    if ignored:
-                        next_depth = (
-                            max_depth_remaining - 1 if max_depth_remaining > 0 else -1
-                        )
-                        if next_depth == 0:
-                            continue
-                        if _directory_has_visible_entries(
-                            entry.path,
-                            rel_posix,
-                            ignore_spec,
-                            cache,
-                            next_depth,
-                        ):
-                            cache[directory] = True
-                            return True
-                        continue
-                else:
-                    if ignore_spec.match_file(rel_posix):
-                        continue
-
-                cache[directory] = True
-                return True
+        listing = _scan_directory(directory)
     except FileNotFoundError:
-        cache[directory] = False
+        visible[directory] = False
         return False
+    cache.listings[directory] = listing
 
-    cache[directory] = False
+    rel_prefix = f"{dir_rel_path}/" if dir_rel_path else ""
+    for entry, is_dir in listing:
+        rel_posix = rel_prefix + entry.name
+
+        if is_dir:
+            if ignore_spec.match_dir(rel_posix):
+                next_depth = max_depth_remaining - 1 if max_depth_remaining > 0 else -1
+                if next_depth == 0:
+                    continue
+                if _directory_has_visible_entries(
+                    entry.path,
+                    rel_posix,
+                    ignore_spec,
+                    cache,
+                    next_depth,
+                ):
+                    visible[directory] = True
+                    return True
+                continue
+        else:
+            if ignore_spec.match_file(rel_posix):
+                continue
+
+        visible[directory] = True
+        return True
+
+    visible[directory] = False
     return False
 
 
@@ -389,6 +384,12 @@ def _create_global_limit_comment(
 ) -> _TreeEntry:
     folders = sum(1 for child in hidden_children if child.item_type == "folder")
     files = sum(1 for child in hidden_children if child.item_type == "file")
+    return _create_limit_comment(parent, folders, files, len(hidden_children))
+
+
+def _create_limit_comment(
+    parent: _TreeEntry, folders: int, files: int, remaining: int
+) -> _TreeEntry:
     parts: list[str] = []
     if folders:
         label = "folder" if folders == 1 else "folders"
@@ -397,7 +398,6 @@ def _create_global_limit_comment(
         label = "file" if files == 1 else "files"
         parts.append(f"{files} {label}")
     if not parts:
-        remaining = len(hidden_children)
         label = "item" if remaining == 1 else "items"
         parts.append(f"{remaining} {label}")
     label_text = ", ".join(parts)
@@ -416,8 +416,8 @@ def _create_global_limit_comment(
 def _create_folder_unprocessed_comment(
     folder_node: _TreeEntry,
     folder_path: str,
-    abs_root: str,
-    ignore_spec: Optional[PathSpec],
+    ignore_spec: Optional[_IgnoreMatcher],
+    cache: _ScanCache,
 ) -> Optional[_TreeEntry]:
     try:
         folders, files = _list_directory_children(
@@ -425,78 +425,97 @@ def _create_folder_unprocessed_comment(
             folder_node.rel_path,
             ignore_spec,
             max_depth_remaining=-1,
-            cache={},
+            cache=cache,
         )
     except FileNotFoundError:
         return None
 
-    hidden_entries: list[_TreeEntry] = []
-    for entry, rel_path in folders:
-        stat = entry.stat(follow_symlinks=False)
-        hidden_entries.append(
-            _TreeEntry(
-                name=entry.name,
-                level=folder_node.level + 1,
-                item_type="folder",
-                created=datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc),
-                modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
-                parent=folder_node,
-                items=None,
-                rel_path=rel_path,
-            )
-        )
-    for entry, rel_path in files:
-        stat = entry.stat(follow_symlinks=False)
-        hidden_entries.append(
-            _TreeEntry(
-                name=entry.name,
-                level=folder_node.level + 1,
-                item_type="file",
-                created=datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc),
-                modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
-                parent=folder_node,
-                items=None,
-                rel_path=rel_path,
-            )
-        )
-
-    if not hidden_entries:
+    # Hidden entries only feed the summary counts, so no per-entry nodes are built
+    if not folders and not files:
         return None
 
-    return _create_global_limit_comment(folder_node, hidden_entries)
+    return _create_limit_comment(
+        folder_node, len(folders), len(files), len(folders) + len(files)
+    )
+
+
+def _finalize_tree(root: _TreeEntry) -> None:
+    """Mark last children and render line text in one pass.
+
+    Uses an explicit stack in pre-order; each entry carries the indentation prefix for the
+    node's children, so a child's prefix is its parent's plus one segment.
+    """
+    stack: list[tuple[_TreeEntry, str]] = [(root, "")]
+    while stack:
+        node, prefix = stack.pop()
+        if node.items is None:
+            continue
+        last_index = len(node.items) - 1
+        for index, child in enumerate(node.items):
+            is_last = index == last_index
+            child.is_last = is_last
+            child.text = _format_line(child, prefix)
+            if child.items is not None:
+                stack.append((child, prefix + ("    " if is_last else "│   ")))
+
+
+class _IgnoreMatcher:
+    """Gitignore matcher over a :class:`PathSpec`.
 
+    When the spec has no negated (``!``) patterns, the outcome does not depend on pattern
+    order, so all pattern regexes are combined into a single compiled alternation and each
+    path is matched once instead of looping over every pattern in Python.
+    """
 
-def _prune_to_visible(node: _TreeEntry, visible_ids: set[int]) -> None:
-    if node.items is None:
-        return
-    filtered: list[_TreeEntry] = []
-    for child in node.items:
-        if not visible_ids or id(child) in visible_ids:
-            _prune_to_visible(child, visible_ids)
-            filtered.append(child)
-    node.items = filtered or None
+    __slots__ = ("spec", "can_reinclude", "_search")
+
+    def __init__(self, spec: PathSpec):
+        self.spec = spec
+        self._search: Optional[Callable[[str], Any]] = None
+        patterns = [pattern for pattern in spec.patterns if pattern.include is not None]
+        # only negated patterns can make an entry below an ignored directory visible again
+        self.can_reinclude = any(not pattern.include for pattern in patterns)
+        if patterns and not self.can_reinclude:
+            # named groups would clash when alternated, make them non-capturing
+            combined = "|".join(
+                f"(?:{pattern.regex.pattern.replace('(?P<ps_d>', '(?:')})"  # type: ignore[attr-defined]
+                for pattern in patterns
+            )
+            self._search = re.compile(combined).search
 
+    def match_file(self, rel_posix: str) -> bool:
+        if self._search is not None:
+            return self._search(rel_posix) is not None
+        return self.spec.match_file(rel_posix)
 
-def _mark_last_flags(node: _TreeEntry) -> None:
-    if node.items is None:
-        return
-    total = len(node.items)
-    for index, child in enumerate(node.items):
-        child.is_last = index == total - 1
-        _mark_last_flags(child)
+    def match_dir(self, rel_posix: str) -> bool:
+        # a directory is ignored when either "dir" or "dir/" matches; for positive-only
+        # patterns matching "dir/" alone covers both, with negations the two can differ
+        # (e.g. "*" with "!*/" ignores "dir" but not "dir/")
+        if self._search is not None:
+            return self._search(f"{rel_posix}/") is not None
+        return self.spec.match_file(rel_posix) or self.spec.match_file(f"{rel_posix}/")
 
 
-def _refresh_render_metadata(node: _TreeEntry) -> None:
-    if node.items is None:
-        return
-    for child in node.items:
-        child.text = _format_line(child)
-        _refresh_render_metadata(child)
+def _read_ignore_file(path: str) -> str:
+    # raw unbuffered read sized by fstat, decoded once (no text-mode line decoder)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(size, 4096))
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b"".join(chunks).decode("utf-8")
 
 
 def _resolve_ignore_patterns(
     ignore: str | None, root_abs_path: str
-) -> Optional[PathSpec]:
+) -> Optional[_IgnoreMatcher]:
     if ignore is None:
         return None
 
@@ -513,147 +532,173 @@ def _resolve_ignore_patterns(
             reference_path = os.path.join(root_abs_path, reference)
 
         try:
-            with open(reference_path, "r", encoding="utf-8") as handle:
-                content = handle.read()
+            content = _read_ignore_file(reference_path)
         except FileNotFoundError as exc:
             raise FileNotFoundError(f"Ignore file not found: {reference_path}") from exc
     else:
         content = ignore
 
-    lines = [
-        line.strip()
-        for line in content.splitlines()
-        if line.strip() and not line.strip().startswith("#")
-    ]
+    return _compile_ignore_patterns(content)
+
+
+# keyed by the pattern text rather than the file reference, so an edited ignore file is
+# recompiled while repeated calls (e.g. UI tree refreshes) reuse the compiled matcher;
+# matchers are never mutated after construction and are safe to share
+@lru_cache(maxsize=32)
+def _compile_ignore_patterns(content: str) -> Optional[_IgnoreMatcher]:
+    stripped = (line.strip() for line in content.splitlines())
+    lines = [line for line in stripped if line and not line.startswith("#")]
 
     if not lines:
         return None
 
-    return PathSpec.from_lines("gitwildmatch", lines)
+    return _IgnoreMatcher(PathSpec.from_lines("gitwildmatch", lines))
 
 
 def _list_directory_children(
     directory: str,
     parent_rel_path: str,
-    ignore_spec: Optional[PathSpec],
+    ignore_spec: Optional[_IgnoreMatcher],
     *,
     max_depth_remaining: int,
-    cache: dict[str, bool],
+    cache: _ScanCache,
 ) -> tuple[list[tuple[os.DirEntry, str]], list[tuple[os.DirEntry, str]]]:
     folders: list[tuple[os.DirEntry, str]] = []
     files: list[tuple[os.DirEntry, str]] = []
 
-    try:
-        with os.scandir(directory) as iterator:
-            for entry in iterator:
-                if entry.name in (".", ".."):
-                    continue
+    # Manual path construction instead of os.path.relpath; parent_rel_path is already
+    # normalized (forward slashes)
+    rel_prefix = f"{parent_rel_path}/" if parent_rel_path else ""
 
-                # Optimization: Manual path construction instead of os.path.relpath
-                # We assume parent_rel_path is already normalized (forward slashes)
-                if parent_rel_path:
-                    rel_posix = f"{parent_rel_path}/{entry.name}"
-                else:
-                    rel_posix = entry.name
-
-                is_directory = entry.is_dir(follow_symlinks=False)
-
-                if ignore_spec:
-                    if is_directory:
-                        ignored = ignore_spec.match_file(
-                            rel_posix
-                        ) or ignore_spec.match_file(f"{rel_posix}/")
-                        if ignored:
-                            if _directory_has_visible_entries(
-                                entry.path,
-                                rel_posix,
-                                ignore_spec,
-                                cache,
-                                max_depth_remaining - 1,
-                            ):
-                                folders.append((entry, rel_posix))
-                            continue
-                    else:
-                        if ignore_spec.match_file(rel_posix):
-                            continue
-
-                if is_directory:
+    # reuse the entries if a visibility probe already read this directory
+    listing = cache.listings.pop(directory, None)
+    if listing is None:
+        try:
+            listing = _scan_directory(directory)
+        except FileNotFoundError:
+            return ([], [])
+
+    if ignore_spec is None:
+        # fast path: no ignore matching, only split folders from files
+        for entry, is_dir in listing:
+            if is_dir:
+                folders.append((entry, rel_prefix + entry.name))
+            else:
+                files.append((entry, rel_prefix + entry.name))
+        return (folders, files)
+
+    for entry, is_dir in listing:
+        rel_posix = rel_prefix + entry.name
+
+        if is_dir:
+            if ignore_spec.match_dir(rel_posix):
+                if _directory_has_visible_entries(
+                    entry.path,
+                    rel_posix,
+                    ignore_spec,
+                    cache,
+                    max_depth_remaining - 1,
+                ):
                     folders.append((entry, rel_posix))
-                else:
-                    files.append((entry, rel_posix))
-    except FileNotFoundError:
-        return ([], [])
+                continue
+            folders.append((entry, rel_posix))
+        else:
+            if ignore_spec.match_file(rel_posix):
+                continue
+            files.append((entry, rel_posix))
 
     return (folders, files)
 
 
+# (entry, rel_path, (ctime, mtime) or None) pair produced by a directory scan, ranked
+# before any _TreeEntry is built for it
+_Candidate = tuple[os.DirEntry, str, Optional[tuple[float, float]]]
+
+
+def _make_candidates(
+    pairs: list[tuple[os.DirEntry, str]], with_times: bool
+) -> list[_Candidate]:
+    if with_times:
+        return [(entry, rel_path, _entry_times(entry)) for entry, rel_path in pairs]
+    return [(entry, rel_path, None) for entry, rel_path in pairs]
+
+
+def _name_sort_key(candidate: _Candidate) -> str:
+    return candidate[0].name.casefold()
+
+
+def _created_sort_key(candidate: _Candidate) -> float:
+    return candidate[2][0]  # type: ignore[index]
+
+
+def _modified_sort_key(candidate: _Candidate) -> float:
+    return candidate[2][1]  # type: ignore[index]
+
+
+# sorted()/heapq already evaluate the key once per entry; resolving the key function once
+# per call avoids re-dispatching on the sort key inside every evaluation
+_SORT_KEY_FUNCS: dict[str, Callable[[_Candidate], Any]] = {
+    SORT_BY_NAME: _name_sort_key,
+    SORT_BY_CREATED: _created_sort_key,
+    SORT_BY_MODIFIED: _modified_sort_key,
+}
+
+
 def _apply_sorting_and_limits(
-    folders: list[_TreeEntry],
-    files: list[_TreeEntry],
+    folders: list[_Candidate],
+    files: list[_Candidate],
     *,
     folders_first: bool,
     sort: tuple[str, str],
     max_folders: int | None,
     max_files: int | None,
     directory_node: _TreeEntry,
+    make_entry: Callable[[_Candidate, Literal["file", "folder"]], _TreeEntry],
 ) -> list[_TreeEntry]:
     sort_key, sort_dir = sort
     reverse = sort_dir == SORT_DESC
 
-    def key_fn(node: _TreeEntry):
-        if sort_key == SORT_BY_NAME:
-            return node.name.casefold()
-        if sort_key == SORT_BY_CREATED:
-            return node.created
-        return node.modified
-
-    folders_sorted = sorted(folders, key=key_fn, reverse=reverse)
-    files_sorted = sorted(files, key=key_fn, reverse=reverse)
+    key_fn = _SORT_KEY_FUNCS[sort_key]
     combined: list[_TreeEntry] = []
 
-    def append_group(group: list[_TreeEntry], limit: int | None, noun: str) -> None:
+    def append_group(
+        group: list[_Candidate],
+        limit: int | None,
+        item_type: Literal["file", "folder"],
+    ) -> None:
         if limit == 0:
             limit = None
         if not group:
             return
-        if limit is None:
-            combined.extend(group)
-            return
-
-        limit = max(limit, 0)
-        visible = group[:limit]
-        combined.extend(visible)
-
-        overflow = group[limit:]
-        if not overflow:
-            return
-
-        combined.append(
-            _create_summary_comment(
-                directory_node,
-                noun,
-                len(overflow),
+        if limit is None or max(limit, 0) >= len(group):
+            selected = sorted(group, key=key_fn, reverse=reverse)
+        else:
+            limit = max(limit, 0)
+            # only the first `limit` entries are rendered: select them in O(N log K) instead of
+            # sorting the whole group (nsmallest/nlargest match sorted(...)[:limit], ties included)
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            selected = select(limit, group, key=key_fn)
+        combined.extend(make_entry(candidate, item_type) for candidate in selected)
+        if len(selected) < len(group):
+            combined.append(
+                _create_summary_comment(
+                    directory_node,
+                    item_type,
+                    len(group) - len(selected),
+                )
             )
-        )
 
     if folders_first:
-        append_group(folders_sorted, max_folders, "folder")
-        append_group(files_sorted, max_files, "file")
+        append_group(folders, max_folders, "folder")
+        append_group(files, max_files, "file")
     else:
-        append_group(files_sorted, max_files, "file")
-        append_group(folders_sorted, max_folders, "folder")
+        append_group(files, max_files, "file")
+        append_group(folders, max_folders, "folder")
 
     return combined
 
 
-def _format_line(node: _TreeEntry) -> str:
-    segments: list[str] = []
-    ancestor = node.parent
-    while ancestor and ancestor.parent is not None:
-        segments.append("    " if ancestor.is_last else "│   ")
-        ancestor = ancestor.parent
-    segments.reverse()
-
+def _format_line(node: _TreeEntry, prefix: str) -> str:
     connector = "└── " if node.is_last else "├── "
     if node.item_type == "folder":
         label = f"{node.name}/"
@@ -662,17 +707,20 @@ def _format_line(node: _TreeEntry) -> str:
     else:
         label = node.name
 
-    return "".join(segments) + connector + label
+    return prefix + connector + label
 
 
 def _build_tree_items_flat(items: Sequence[_TreeEntry]) -> list[dict]:
+    # timestamps are converted inline through local bindings: on large trees a helper
+    # call per field dominated building the output dicts
+    fromtimestamp, utc = datetime.fromtimestamp, timezone.utc
     return [
         {
             "name": node.name,
             "level": node.level,
             "type": node.item_type,
-            "created": node.created,
-            "modified": node.modified,
+            "created": None if node.created is None else fromtimestamp(node.created, utc),
+            "modified": None if node.modified is None else fromtimestamp(node.modified, utc),
             "text": node.text,
             "items": None,
         }
@@ -681,25 +729,34 @@ def _build_tree_items_flat(items: Sequence[_TreeEntry]) -> list[dict]:
 
 
 def _to_nested_structure(items: Sequence[_TreeEntry]) -> list[dict]:
-    def convert(node: _TreeEntry) -> dict:
-        children = None
+    fromtimestamp, utc = datetime.fromtimestamp, timezone.utc
+    result: list[dict] = []
+    # (node, list the node's dict is appended to); reversed so siblings pop in order
+    stack: list[tuple[_TreeEntry, list[dict]]] = [(node, result) for node in reversed(items)]
+    while stack:
+        node, target = stack.pop()
+        children: Optional[list[dict]] = None
         if node.items is not None:
-            children = [convert(child) for child in node.items]
-        return {
-            "name": node.name,
-            "level": node.level,
-            "type": node.item_type,
-            "created": node.created,
-            "modified": node.modified,
-            "text": node.text,
-            "items": children,
-        }
-
-    return [convert(item) for item in items]
+            children = []
+            stack.extend((child, children) for child in reversed(node.items))
+        target.append(
+            {
+                "name": node.name,
+                "level": node.level,
+                "type": node.item_type,
+                "created": None if node.created is None else fromtimestamp(node.created, utc),
+                "modified": None if node.modified is None else fromtimestamp(node.modified, utc),
+                "text": node.text,
+                "items": children,
+            }
+        )
+    return result
 
 
 def _iter_depth_first(items: Sequence[_TreeEntry]) -> Iterable[_TreeEntry]:
-    for node in items:
+    stack = list(reversed(items))
+    while stack:
+        node = stack.pop()
         yield node
         if node.items:
-            yield from _iter_depth_first(node.items)
+            stack.extend(reversed(node.items))
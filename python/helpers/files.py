@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from fnmatch import fnmatch
+from fnmatch import fnmatch, translate
+from functools import lru_cache
 import json
 from ntpath import isabs
 import os
@@ -8,14 +9,26 @@ import re
 import base64
 import shutil
 import tempfile
-from typing import Any
+import time
+from typing import Any, Callable
 import zipfile
 import importlib
 import importlib.util
 import inspect
-import glob
 import mimetypes
-from simpleeval import simple_eval
+from simpleeval import SimpleEval
+
+
+# template patterns, compiled once at import instead of on every render
+_IF_RE = re.compile(r"{{\s*if\s+(.*?)}}", flags=re.DOTALL)
+_TOKEN_RE = re.compile(r"{{\s*(if\b.*?|endif)\s*}}", flags=re.DOTALL)
+_INCLUDE_RE = re.compile(r"{{\s*include\s*['\"](.*?)['\"]\s*}}")
+_FENCE_RE = re.compile(r"(```|~~~)(.*?\n)(.*?)(\1)", flags=re.DOTALL)
+_JSON_FENCE_RE = re.compile(r"^\s*(```|~~~)\s*json\s*\n(.*?)\n\1\s*$", flags=re.DOTALL)
+_PLACEHOLDER_RE = re.compile(r"{{(\w+)}}")
+# any brace-free {{key}} of text templates, so keys like "a-b" or "a.b" are replaced too
+_TEXT_PLACEHOLDER_RE = re.compile(r"{{([^{}]*)}}")
+_SAFE_NAME_RE = re.compile(r"[^a-zA-Z0-9-._]")
 
 
 class VariablesPlugin(ABC):
@@ -24,6 +37,26 @@ class VariablesPlugin(ABC):
         pass
 
 
+# plugin class per file, reloaded only when the file's mtime changes
+_PLUGIN_CACHE: dict[str, tuple[int, type[VariablesPlugin] | None]] = {}
+
+
+def _load_variables_plugin(plugin_file: str) -> type[VariablesPlugin] | None:
+    mtime = os.stat(plugin_file).st_mtime_ns
+    cached = _PLUGIN_CACHE.get(plugin_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    from python.helpers import extract_tools
+
+    classes = extract_tools.load_classes_from_file(
+        plugin_file, VariablesPlugin, one_per_file=False
+    )
+    cls = classes[0] if classes else None
+    _PLUGIN_CACHE[plugin_file] = (mtime, cls)
+    return cls
+
+
 def load_plugin_variables(
     file: str, backup_dirs: list[str] | None = None, **kwargs
 ) -> dict[str, Any]:
@@ -43,12 +76,8 @@ def load_plugin_variables(
 
     if plugin_file and exists(plugin_file):
 
-        from python.helpers import extract_tools
-
-        classes = extract_tools.load_classes_from_file(
-            plugin_file, VariablesPlugin, one_per_file=False
-        )
-        for cls in classes:
+        cls = _load_variables_plugin(plugin_file)
+        if cls:
             return cls().get_variables(file, backup_dirs, **kwargs)  # type: ignore < abstract class here is ok, it is always a subclass
 
         # load python code and extract variables variables from it
@@ -81,6 +110,36 @@ def load_plugin_variables(
 from python.helpers.strings import sanitize_string
 
 
+# raw template contents keyed by (path, encoding), validated by mtime and size; only the
+# file read is cached, rendering still runs on every call since plugin variables and
+# includes can change independently of the file itself
+_TEMPLATE_CACHE: dict[tuple[str, str], tuple[int, int, str]] = {}
+_TEMPLATE_CACHE_SIZE = 512
+
+
+def _read_template(absolute_path: str, encoding: str) -> str:
+    stat = os.stat(absolute_path)
+    key = (absolute_path, encoding)
+    cached = _TEMPLATE_CACHE.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with open(absolute_path, "r", encoding=encoding) as f:
+        content = f.read()
+
+    if key not in _TEMPLATE_CACHE and len(_TEMPLATE_CACHE) >= _TEMPLATE_CACHE_SIZE:
+        # evict the oldest entry
+        del _TEMPLATE_CACHE[next(iter(_TEMPLATE_CACHE))]
+    _TEMPLATE_CACHE[key] = (stat.st_mtime_ns, stat.st_size, content)
+    return content
+
+
+@lru_cache(maxsize=128)
+def _prepare_parsed_template(content: str) -> tuple[bool, str]:
+    # JSON detection and fence removal only depend on the file content, not on kwargs
+    return is_full_json_template(content), remove_code_fences(content)
+
+
 def parse_file(
     _filename: str, _directories: list[str] | None = None, _encoding="utf-8", **kwargs
 ):
@@ -91,12 +150,9 @@ def parse_file(
     absolute_path = find_file_in_dirs(_filename, _directories)
 
     # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
-
-    is_json = is_full_json_template(content)
-    content = remove_code_fences(content)
+    is_json, content = _prepare_parsed_template(
+        _read_template(absolute_path, _encoding)
+    )
     variables = load_plugin_variables(absolute_path, _directories, **kwargs) or {}  # type: ignore
     variables.update(kwargs)
     if is_json:
@@ -132,9 +188,7 @@ def read_prompt_file(
     absolute_path = find_file_in_dirs(_file, _directories)
 
     # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
+    content = _read_template(absolute_path, _encoding)
 
     variables = load_plugin_variables(_file, _directories, **kwargs) or {}  # type: ignore
     variables.update(kwargs)
@@ -156,51 +210,78 @@ def read_prompt_file(
     return content
 
 
+@lru_cache(maxsize=256)
+def _parse_condition(condition: str):
+    # templates are rendered repeatedly with the same conditions, parse each one once
+    return SimpleEval.parse(condition)
+
+
 def evaluate_text_conditions(_content: str, **kwargs):
     # search for {{if ...}} ... {{endif}} blocks and evaluate conditions with nesting support
-    if_pattern = re.compile(r"{{\s*if\s+(.*?)}}", flags=re.DOTALL)
-    token_pattern = re.compile(r"{{\s*(if\b.*?|endif)\s*}}", flags=re.DOTALL)
-
-    def _process(text: str) -> str:
-        m_if = if_pattern.search(text)
+    # segments still to process, innermost last; kept fragments are joined once at the end
+    pending = [_content]
+    parts: list[str] = []
+    evaluator: SimpleEval | None = None
+
+    while pending:
+        text = pending.pop()
+        m_if = _IF_RE.search(text)
         if not m_if:
-            return text
+            parts.append(text)
+            continue
 
         depth = 1
         pos = m_if.end()
         while True:
-            m = token_pattern.search(text, pos)
+            m = _TOKEN_RE.search(text, pos)
             if not m:
-                # Unterminated if-block, do not modify text
-                return text
+                break
             token = m.group(1)
             depth += 1 if token.startswith("if ") else -1
             if depth == 0:
                 break
             pos = m.end()
+        if not m:
+            # Unterminated if-block, do not modify text
+            parts.append(text)
+            continue
 
-        before = text[: m_if.start()]
         condition = m_if.group(1).strip()
-        inner = text[m_if.end() : m.start()]
-        after = text[m.end() :]
-
         try:
-            result = simple_eval(condition, names=kwargs)
+            if evaluator is None:
+                evaluator = SimpleEval(names=kwargs)
+            result = evaluator.eval(condition, _parse_condition(condition))
         except Exception:
             # On evaluation error, do not modify this block
-            return text
+            parts.append(text)
+            continue
 
+        parts.append(text[: m_if.start()])
+        # Continue processing the remaining text after this block
+        pending.append(text[m.end() :])
         if result:
-            # Keep inner content (processed recursively), remove if/endif markers
-            kept = before + _process(inner)
-        else:
-            # Skip entire block, including inner content and markers
-            kept = before
+            # Keep inner content (processed first), remove if/endif markers
+            pending.append(text[m_if.end() : m.start()])
+        # otherwise skip entire block, including inner content and markers
 
-        # Continue processing the remaining text after this block
-        return kept + _process(after)
+    return "".join(parts)
+
+
+def _read_bytes(absolute_path: str) -> bytes:
+    # whole-file read straight from the descriptor, sized by fstat, without the buffered
+    # io layer; keeps reading until EOF in case the file grows or reports no size (procfs)
+    fd = os.open(absolute_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while chunk := os.read(fd, max(size, 64 * 1024)):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return chunks[0] if len(chunks) == 1 else b"".join(chunks)
 
-    return _process(_content)
+
+_BASE64_CHUNK_SIZE = 57 * 1024
 
 
 def read_file(relative_path: str, encoding="utf-8"):
@@ -208,8 +289,35 @@ def read_file(relative_path: str, encoding="utf-8"):
     absolute_path = get_abs_path(relative_path)
 
     # Read the file content
-    with open(absolute_path, "r", encoding=encoding) as f:
-        return f.read()
+    return _decode_text(_read_bytes(absolute_path), encoding)
+
+
+def _decode_text(data: bytes, encoding: str) -> str:
+    # decode with the same newline translation as text mode
+    content = data.decode(encoding)
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+_BINARY_SNIFF_SIZE = 512
+
+
+def _read_text_unless_binary(absolute_path: str, encoding="utf-8") -> str | None:
+    # reads the first block before committing to the whole file: a NUL byte in it marks the
+    # file as binary, which is then skipped without loading the rest
+    fd = os.open(absolute_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        head = os.read(fd, _BINARY_SNIFF_SIZE)
+        if b"\x00" in head:
+            return None
+        size = os.fstat(fd).st_size
+        chunks = [head]
+        while chunk := os.read(fd, max(size - len(head), 64 * 1024)):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return _decode_text(b"".join(chunks), encoding)
 
 
 def read_file_bin(relative_path: str):
@@ -217,71 +325,102 @@ def read_file_bin(relative_path: str):
     absolute_path = get_abs_path(relative_path)
 
     # read binary content
-    with open(absolute_path, "rb") as f:
-        return f.read()
+    return _read_bytes(absolute_path)
 
 
 def read_file_base64(relative_path):
     # get absolute path
     absolute_path = get_abs_path(relative_path)
 
-    # read binary content and encode to base64
+    # read and encode in chunks (a multiple of 3 bytes, so no padding mid-stream) so the
+    # whole binary content and its encoding are never held in memory at the same time
+    # (buffered read returns full chunks until EOF, a raw os.read may return short ones)
+    encoded = bytearray()
     with open(absolute_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+        while chunk := f.read(_BASE64_CHUNK_SIZE):
+            encoded += base64.b64encode(chunk)
+    return encoded.decode("ascii")
 
 
 def replace_placeholders_text(_content: str, **kwargs):
-    # Replace placeholders with values from kwargs
-    for key, value in kwargs.items():
-        placeholder = "{{" + key + "}}"
-        strval = str(value)
-        _content = _content.replace(placeholder, strval)
-    return _content
+    # nothing to replace, skip scanning the content
+    if "{{" not in _content:
+        return _content
+    return _replace_placeholders(_content, kwargs, str)
 
 
 def replace_placeholders_json(_content: str, **kwargs):
-    # Replace placeholders with values from kwargs
+    if "{{" not in _content:
+        return _content
+    return _replace_placeholders(_content, kwargs, json.dumps)
+
+
+def _replace_placeholders(content: str, kwargs: dict[str, Any], render: Callable[[Any], str]):
+    # Replace placeholders with values from kwargs in a single pass over the content
+    def replace(match):
+        key = match.group(1)
+        if key in kwargs:
+            return render(kwargs[key])
+        return match.group(0)
+
+    content = _TEXT_PLACEHOLDER_RE.sub(replace, content)
+
+    # keys containing braces cannot be matched by the pattern, replace them one by one
     for key, value in kwargs.items():
-        placeholder = "{{" + key + "}}"
-        if placeholder in _content:
-            strval = json.dumps(value)
-            _content = _content.replace(placeholder, strval)
-    return _content
+        if "{" in key or "}" in key:
+            placeholder = "{{" + key + "}}"
+            if placeholder in content:
+                content = content.replace(placeholder, render(value))
+    return content
 
 
 def replace_placeholders_dict(_content: dict, **kwargs):
+    def replace_placeholder(match):
+        key = match.group(1)
+        if key not in kwargs:
+            return match.group(0)
+        replacement = kwargs[key]
+        if isinstance(replacement, (dict, list)):
+            return json.dumps(replacement)
+        return str(replacement)
+
+    def replace_string(value: str):
+        if "{{" not in value:
+            return value
+        # a value that is a single placeholder takes the replacement as is
+        whole = _PLACEHOLDER_RE.fullmatch(value)
+        if whole and whole.group(1) in kwargs:
+            return kwargs[whole.group(1)]
+        return _PLACEHOLDER_RE.sub(replace_placeholder, value)
+
+    # walk nested dicts/lists with an explicit stack instead of recursion: containers are
+    # copied empty right away and filled in when their (source, copy) pair is popped
+    stack: list[tuple[Any, Any]] = []
+
     def replace_value(value):
         if isinstance(value, str):
-            placeholders = re.findall(r"{{(\w+)}}", value)
-            if placeholders:
-                for placeholder in placeholders:
-                    if placeholder in kwargs:
-                        replacement = kwargs[placeholder]
-                        if value == f"{{{{{placeholder}}}}}":
-                            return replacement
-                        elif isinstance(replacement, (dict, list)):
-                            value = value.replace(
-                                f"{{{{{placeholder}}}}}", json.dumps(replacement)
-                            )
-                        else:
-                            value = value.replace(
-                                f"{{{{{placeholder}}}}}", str(replacement)
-                            )
-            return value
+            return replace_string(value)
         elif isinstance(value, dict):
-            return {k: replace_value(v) for k, v in value.items()}
+            copy: Any = {}
         elif isinstance(value, list):
-            return [replace_value(item) for item in value]
+            copy = []
         else:
             return value
-
-    return replace_value(_content)
+        stack.append((value, copy))
+        return copy
+
+    result = replace_value(_content)
+    while stack:
+        source, target = stack.pop()
+        if isinstance(source, dict):
+            for k, v in source.items():
+                target[k] = replace_value(v)
+        else:
+            target.extend([replace_value(item) for item in source])
+    return result
 
 
 def process_includes(_content: str, _directories: list[str], **kwargs):
-    # Regex to find {{ include 'path' }} or {{include'path'}}
-    include_pattern = re.compile(r"{{\s*include\s*['\"](.*?)['\"]\s*}}")
-
     def replace_include(match):
         include_path = match.group(1)
         # if the path is absolute, do not process it
@@ -294,8 +433,8 @@ def process_includes(_content: str, _directories: list[str], **kwargs):
         except FileNotFoundError:
             return match.group(0)  # Return original if file not found
 
-    # Replace all includes with the file content
-    return re.sub(include_pattern, replace_include, _content)
+    # Replace all {{ include 'path' }} or {{include'path'}} with the file content
+    return _INCLUDE_RE.sub(replace_include, _content)
 
 
 def find_file_in_dirs(_filename: str, _directories: list[str]):
@@ -320,37 +459,44 @@ def get_unique_filenames_in_dirs(dir_paths: list[str], pattern: str = "*"):
     # returns absolute paths for unique filenames, priority by order in dir_paths
     seen = set()
     result = []
+    # glob skips hidden files unless the pattern itself starts with a dot
+    include_hidden = pattern.startswith(".")
     for dir_path in dir_paths:
         full_dir = get_abs_path(dir_path)
-        for file_path in glob.glob(os.path.join(full_dir, pattern)):
-            fname = os.path.basename(file_path)
-            if fname not in seen and os.path.isfile(file_path):
-                seen.add(fname)
-                result.append(get_abs_path(file_path))
+        try:
+            # scandir reports the entry type from the directory read, no stat per file
+            with os.scandir(full_dir) as entries:
+                for entry in entries:
+                    fname = entry.name
+                    if fname in seen or not fnmatch(fname, pattern):
+                        continue
+                    if fname.startswith(".") and not include_hidden:
+                        continue
+                    if entry.is_file():
+                        seen.add(fname)
+                        result.append(entry.path)
+        except OSError:
+            continue
     # sort by filename (basename), not the full path
     result.sort(key=lambda path: os.path.basename(path))
     return result
 
 
 def remove_code_fences(text):
-    # Pattern to match code fences with optional language specifier
-    pattern = r"(```|~~~)(.*?\n)(.*?)(\1)"
+    # most templates have no fences, skip the regex scan for them
+    if "```" not in text and "~~~" not in text:
+        return text
 
-    # Function to replace the code fences
+    # Function to replace the code fences (with optional language specifier)
     def replacer(match):
         return match.group(3)  # Return the code without fences
 
-    # Use re.DOTALL to make '.' match newlines
-    result = re.sub(pattern, replacer, text, flags=re.DOTALL)
-
-    return result
+    return _FENCE_RE.sub(replacer, text)
 
 
 def is_full_json_template(text):
-    # Pattern to match the entire text enclosed in ```json or ~~~json fences
-    pattern = r"^\s*(```|~~~)\s*json\s*\n(.*?)\n\1\s*$"
-    # Use re.DOTALL to make '.' match newlines
-    match = re.fullmatch(pattern, text.strip(), flags=re.DOTALL)
+    # Match the entire text enclosed in ```json or ~~~json fences
+    match = _JSON_FENCE_RE.fullmatch(text.strip())
     return bool(match)
 
 
@@ -382,6 +528,12 @@ def delete_dir(relative_path: str):
     # ensure deletion of directory without propagating errors
     abs_path = get_abs_path(relative_path)
     if os.path.exists(abs_path):
+        # move the directory into the trash folder with a single rename first, so it is gone
+        # for callers right away even while (or if) removing its content takes longer
+        # (rmtree refuses files and symlinks, those are left in place as before)
+        if os.path.isdir(abs_path) and not os.path.islink(abs_path):
+            abs_path = _move_to_trash(abs_path)
+
         # first try with ignore_errors=True which is the safest option
         shutil.rmtree(abs_path, ignore_errors=True)
 
@@ -427,6 +579,47 @@ def move_dir_safe(src, dst, rename_format="{name}_{number}"):
     return dst
 
 
+# delete_dir renames directories into this folder first, it lies outside of every listed
+# folder; leftovers of deletions that failed or were interrupted are removed by sweep_trash
+TRASH_FOLDER = "tmp/.trash"
+
+
+def _move_to_trash(abs_path: str) -> str:
+    trash_dir = get_abs_path(TRASH_FOLDER)
+    abs_path = os.path.normpath(abs_path)
+    try:
+        # the trash folder itself and its content are deleted in place
+        if os.path.commonpath([abs_path, trash_dir]) in (abs_path, trash_dir):
+            return abs_path
+        os.makedirs(trash_dir, exist_ok=True)
+        trash_path = os.path.join(
+            trash_dir,
+            f"{os.path.basename(abs_path)}_{os.getpid()}_{time.monotonic_ns()}",
+        )
+        os.rename(abs_path, trash_path)
+        return trash_path
+    except (OSError, ValueError):
+        # other drive or filesystem, or no permission: delete in place
+        return abs_path
+
+
+def sweep_trash():
+    """
+    Removes what failed or interrupted deletions left in the trash folder.
+    Called once at startup; entries of deletions running in this process are skipped.
+    """
+    trash_dir = get_abs_path(TRASH_FOLDER)
+    try:
+        names = os.listdir(trash_dir)
+    except OSError:
+        return
+    # entries are named <name>_<pid>_<ns>
+    own_pid = str(os.getpid())
+    for name in names:
+        if name.rsplit("_", 2)[-2:-1] != [own_pid]:
+            shutil.rmtree(os.path.join(trash_dir, name), ignore_errors=True)
+
+
 # create dir safely, add number if needed
 def create_dir_safe(dst, rename_format="{name}_{number}"):
     base_dst = dst
@@ -455,9 +648,11 @@ def make_dirs(relative_path: str):
     os.makedirs(os.path.dirname(abs_path), exist_ok=True)
 
 
+# the same few paths are resolved over and over by every file helper
+@lru_cache(maxsize=1024)
 def get_abs_path(*relative_paths):
     "Convert relative paths to absolute paths based on the base directory."
-    return os.path.join(get_base_dir(), *relative_paths)
+    return os.path.join(_BASE_DIR, *relative_paths)
 
 
 def deabsolute_path(path: str):
@@ -488,16 +683,27 @@ def exists(*relative_paths):
     return os.path.exists(path)
 
 
+# Get the base directory from the current file path, it never changes while running
+_BASE_DIR = os.path.dirname(os.path.abspath(os.path.join(__file__, "../../")))
+
+
 def get_base_dir():
-    # Get the base directory from the current file path
-    base_dir = os.path.dirname(os.path.abspath(os.path.join(__file__, "../../")))
-    return base_dir
+    return _BASE_DIR
+
+
+# with a single "/" separator the basename of a str is just the tail after the last slash;
+# other platforms and path objects (pathlib.Path, bytes) go through os.path
+_POSIX_PATHS = os.sep == "/" and os.altsep is None
 
 
 def basename(path: str, suffix: str | None = None):
+    if _POSIX_PATHS and type(path) is str:
+        name = path.rpartition("/")[2]
+    else:
+        name = os.path.basename(path)
     if suffix:
-        return os.path.basename(path).removesuffix(suffix)
-    return os.path.basename(path)
+        return name.removesuffix(suffix)
+    return name
 
 
 def dirname(path: str):
@@ -509,8 +715,9 @@ def is_in_base_dir(path: str):
     base_dir = get_base_dir()
     # normalize paths to handle relative paths and symlinks
     abs_path = os.path.abspath(path)
-    # check if the absolute path starts with the base directory
-    return os.path.commonpath([abs_path, base_dir]) == base_dir
+    # check if the absolute path is the base directory or below it
+    prefix = base_dir if base_dir.endswith(os.sep) else base_dir + os.sep
+    return abs_path == base_dir or abs_path.startswith(prefix)
 
 
 def get_subdirectories(
@@ -525,24 +732,43 @@ def get_subdirectories(
         include = [include]
     if isinstance(exclude, str):
         exclude = [exclude]
-    return [
-        subdir
-        for subdir in os.listdir(abs_path)
-        if os.path.isdir(os.path.join(abs_path, subdir))
-        and any(fnmatch(subdir, inc) for inc in include)
-        and (exclude is None or not any(fnmatch(subdir, exc) for exc in exclude))
-    ]
+    with os.scandir(abs_path) as entries:
+        return [
+            entry.name
+            for entry in entries
+            if entry.is_dir()
+            and any(fnmatch(entry.name, inc) for inc in include)
+            and (exclude is None or not any(fnmatch(entry.name, exc) for exc in exclude))
+        ]
+
+
+# formats that deflate cannot shrink meaningfully, compressing them only burns CPU
+_COMPRESSED_EXTENSIONS = frozenset(
+    {
+        ".7z", ".avif", ".br", ".bz2", ".docx", ".flac", ".gif", ".gz", ".heic",
+        ".jar", ".jpeg", ".jpg", ".m4a", ".mkv", ".mov", ".mp3", ".mp4", ".ogg",
+        ".parquet", ".pdf", ".png", ".pptx", ".rar", ".tgz", ".webm", ".webp",
+        ".whl", ".xlsx", ".xz", ".zip", ".zst",
+    }
+)
 
 
 def zip_dir(dir_path: str):
     full_path = get_abs_path(dir_path)
     zip_file_path = tempfile.NamedTemporaryFile(suffix=".zip", delete=False).name
     base_name = os.path.basename(full_path)
-    with zipfile.ZipFile(zip_file_path, "w", compression=zipfile.ZIP_DEFLATED) as zip:
-        for root, _, files in os.walk(full_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, full_path)
+    # fastest deflate level; already compressed formats are stored as is
+    with zipfile.ZipFile(
+        zip_file_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1
+    ) as zip:
+        for file_path, rel_path in _walk_files(full_path):
+            if os.path.splitext(rel_path)[1].lower() in _COMPRESSED_EXTENSIONS:
+                zip.write(
+                    file_path,
+                    os.path.join(base_name, rel_path),
+                    compress_type=zipfile.ZIP_STORED,
+                )
+            else:
                 zip.write(file_path, os.path.join(base_name, rel_path))
     return zip_file_path
 
@@ -556,7 +782,20 @@ def move_file(relative_path: str, new_path: str):
 
 def safe_file_name(filename: str) -> str:
     # Replace any character that's not alphanumeric, dash, underscore, or dot with underscore
-    return re.sub(r"[^a-zA-Z0-9-._]", "_", filename)
+    return _SAFE_NAME_RE.sub("_", filename)
+
+
+# extensions that mimetypes maps to text/* everywhere, checked without a mime lookup
+_TEXT_EXTENSIONS = frozenset({".txt", ".md", ".py", ".csv", ".tsv", ".html", ".css", ".js"})
+
+
+@lru_cache(maxsize=256)
+def _is_text_extension(extension: str) -> bool:
+    if extension.lower() in _TEXT_EXTENSIONS:
+        return True
+    # files with an unknown mime type are still read, only known non-text types are skipped
+    mime, _ = mimetypes.guess_type("file" + extension)
+    return mime is None or mime.startswith("text")
 
 
 def read_text_files_in_dir(
@@ -567,21 +806,24 @@ def read_text_files_in_dir(
     if not os.path.exists(abs_path):
         return {}
     result = {}
+    # compiled once instead of fnmatch normalizing and looking the pattern up per entry
+    name_matches = re.compile(translate(os.path.normcase(pattern))).match
     try:
         with os.scandir(abs_path) as entries:
             for entry in entries:
                 try:
                     if not entry.is_file():
                         continue
-                    if not fnmatch(entry.name, pattern):
+                    if not name_matches(os.path.normcase(entry.name)):
                         continue
                     if max_size > 0 and entry.stat().st_size > max_size:
                         continue
-                    mime, _ = mimetypes.guess_type(entry.path)
-                    if mime is not None and not mime.startswith("text"):
+                    if not _is_text_extension(os.path.splitext(entry.name)[1]):
                         continue
                     # Check if file is binary by reading a small chunk
-                    content = read_file(entry.path)
+                    content = _read_text_unless_binary(entry.path)
+                    if content is None:
+                        continue
                     result[entry.name] = content
                 except Exception:
                     continue
@@ -593,12 +835,32 @@ def list_files_in_dir_recursively(relative_path: str) -> list[str]:
     abs_path = get_abs_path(relative_path)
     if not os.path.exists(abs_path):
         return []
-    result = []
-    for root, dirs, files in os.walk(abs_path):
-        for file in files:
-            file_path = os.path.join(root, file)
-            # Return relative path from the base directory
-            rel_path = os.path.relpath(file_path, abs_path)
-            result.append(rel_path)
-    return result
+    # Return relative paths from the base directory
+    return [rel_path for _, rel_path in _walk_files(abs_path)]
+
+
+def _walk_files(root: str):
+    # yields (absolute path, path relative to root) for every file under root, in the same
+    # order as os.walk and without following directory symlinks; entry types come from
+    # scandir and relative paths are built up instead of recomputed with relpath
+    stack = [(root, "")]
+    while stack:
+        directory, rel_dir = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    rel_path = os.path.join(rel_dir, entry.name)
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        yield entry.path, rel_path
+                    elif not entry.is_symlink():
+                        subdirs.append((entry.path, rel_path))
+        except OSError:
+            continue
+        # reversed so subdirectories are visited in listing order
+        stack.extend(reversed(subdirs))
     
\ No newline at end of file
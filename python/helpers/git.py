@@ -1,14 +1,66 @@
 from git import Repo
 from datetime import datetime
 import os
+import threading
 from python.helpers import files
 
+# one Repo per process: GitPython keeps persistent "git cat-file" processes per Repo object,
+# so reusing it avoids spawning new git processes on every call
+_repo: Repo | None = None
+_repo_lock = threading.Lock()
+
+def _get_repo() -> Repo:
+    global _repo
+    if _repo is None:
+        # Get the current working directory (assuming the repo is in the same folder as the script)
+        _repo = Repo(files.get_base_dir())
+    return _repo
+
+# last git info with the state stamp it was read at
+_info_cache: tuple[tuple, dict] | None = None
+
 def get_git_info():
-    # Get the current working directory (assuming the repo is in the same folder as the script)
-    repo_path = files.get_base_dir()
-    
-    # Open the Git repository
-    repo = Repo(repo_path)
+    global _info_cache
+    # the persistent cat-file processes are not safe to share between threads
+    with _repo_lock:
+        try:
+            repo = _get_repo()
+            stamp = _state_stamp(repo)
+            if _info_cache is None or _info_cache[0] != stamp:
+                _info_cache = (stamp, _read_git_info(repo))
+            return dict(_info_cache[1])
+        except Exception:
+            # drop the cached repo so the next call starts from a fresh one
+            _reset_repo()
+            raise
+
+def _state_stamp(repo: Repo) -> tuple:
+    # commits, checkouts, resets and new tags all touch one of these, so the cached info
+    # stays valid while none of them changed
+    paths = (
+        os.path.join(repo.git_dir, "HEAD"),
+        os.path.join(repo.git_dir, "logs", "HEAD"),
+        os.path.join(repo.common_dir, "packed-refs"),
+        os.path.join(repo.common_dir, "refs", "heads"),
+        os.path.join(repo.common_dir, "refs", "tags"),
+    )
+    stamp = []
+    for path in paths:
+        try:
+            stamp.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+def _reset_repo():
+    global _repo, _info_cache
+    _info_cache = None
+    if _repo is not None:
+        _repo.close()
+        _repo = None
+
+def _read_git_info(repo: Repo):
+    repo_path = repo.working_dir
 
     # Ensure the repository is not bare
     if repo.bare:
@@ -229,7 +229,7 @@ class Log:
         if self.logs:
             prev = self.logs[-1]
             prev.duration_ms = int((item.timestamp - prev.timestamp) * 1000)
-            self.updates += [prev.no]
+            self.updates.append(prev.no)
         self.logs.append(item)
 
         # and update it (to have just one implementation)
@@ -294,7 +294,7 @@ class Log:
             kwargs = self._mask_recursive(kwargs)
             item.kvps.update(kwargs)
 
-        self.updates += [item.no]
+        self.updates.append(item.no)
         self._update_progress_from_item(item)
 
     def set_progress(self, progress: str, no: int = 0, active: bool = True):
@@ -315,14 +315,9 @@ class Log:
         if end is None:
             end = len(self.updates)
 
-        out = []
-        seen = set()
-        for update in self.updates[start:end]:
-            if update not in seen:
-                out.append(self.logs[update].output())
-                seen.add(update)
-
-        return out
+        # only updates since the client's last version are visited, each changed item once
+        logs = self.logs
+        return [logs[no].output() for no in dict.fromkeys(self.updates[start:end])]
 
     def reset(self):
         self.guid = str(uuid.uuid4())
@@ -4,9 +4,10 @@ import json
 import os
 import re
 import subprocess
-from typing import Any, Literal, TypedDict, cast, TypeVar
+from typing import Any, Callable, Literal, TypedDict, cast, TypeVar
 
 import models
+import orjson
 from python.helpers import runtime, whisper, defer, git
 from . import files, dotenv
 from python.helpers.print_style import PrintStyle
@@ -17,6 +18,22 @@ from python.helpers import dirty_json
 
 T = TypeVar('T')
 
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() in ('true', '1', 'yes', 'on')
+
+
+# converts a stripped A0_SET_ value to the type of the setting's default
+_COERCERS: dict[type, Callable[[str], Any]] = {
+    bool: _parse_bool,
+    int: int,
+    float: float,
+    str: str,
+    dict: json.loads,
+    list: json.loads,
+}
+
+
 def get_default_value(name: str, value: T) -> T:
     """
     Load setting value from .env with A0_SET_ prefix, falling back to default.
@@ -28,21 +45,17 @@ def get_default_value(name: str, value: T) -> T:
     Returns:
         Environment variable value (type-normalized) or default value
     """
-    env_value = dotenv.get_dotenv_value(f"A0_SET_{name}", dotenv.get_dotenv_value(f"A0_SET_{name.upper()}", None))
+    env_value = dotenv.get_dotenv_value(f"A0_SET_{name}")
+    if env_value is None:
+        env_value = dotenv.get_dotenv_value(f"A0_SET_{name.upper()}")
 
     if env_value is None:
         return value
 
     # Normalize type to match value param type
     try:
-        if isinstance(value, bool):
-            return env_value.strip().lower() in ('true', '1', 'yes', 'on')  # type: ignore
-        elif isinstance(value, dict):
-            return json.loads(env_value.strip())  # type: ignore
-        elif isinstance(value, str):
-            return str(env_value).strip()  # type: ignore
-        else:
-            return type(value)(env_value.strip())  # type: ignore
+        coerce = _COERCERS.get(type(value), type(value))
+        return coerce(env_value.strip())  # type: ignore
     except (ValueError, TypeError, json.JSONDecodeError) as e:
         PrintStyle(background_color="yellow", font_color="black").print(
             f"Warning: Invalid value for A0_SET_{name}='{env_value}': {e}. Using default: {value}"
@@ -211,28 +224,28 @@ API_KEY_PLACEHOLDER = "************"
 SETTINGS_FILE = files.get_abs_path("tmp/settings.json")
 _settings: Settings | None = None
 
-OptionT = TypeVar("OptionT", bound=FieldOption)
+# (additional options list, setting key): the selected value is added to the dropdown
+# options when missing, e.g. a provider or profile that is no longer listed
+_SELECTED_OPTION_CHECKS = (
+    ("chat_providers", "chat_model_provider"),
+    ("chat_providers", "util_model_provider"),
+    ("chat_providers", "browser_model_provider"),
+    ("embedding_providers", "embed_model_provider"),
+    ("shell_interfaces", "shell_interface"),
+    ("agent_subdirs", "agent_profile"),
+    ("knowledge_subdirs", "agent_knowledge_subdir"),
+    ("stt_models", "stt_model_size"),
+)
 
-def _ensure_option_present(options: list[OptionT] | None, current_value: str | None) -> list[OptionT]:
-    """
-    Ensure the currently selected value exists in a dropdown options list.
-    If missing, inserts it at the front as {value: current_value, label: current_value}.
-    """
-    opts = list(options or [])
-    if not current_value:
-        return opts
-    for o in opts:
-        if o.get("value") == current_value:
-            return opts
-    opts.insert(0, cast(OptionT, {"value": current_value, "label": current_value}))
-    return opts
 
 def convert_out(settings: Settings) -> SettingsOutput:
+    chat_providers = get_providers("chat")
+    embedding_providers = get_providers("embedding")
     out = SettingsOutput(
         settings = settings.copy(),
         additional = SettingsOutputAdditional(
-            chat_providers=get_providers("chat"),
-            embedding_providers=get_providers("embedding"),
+            chat_providers=chat_providers,
+            embedding_providers=embedding_providers,
             shell_interfaces=[{"value": "local", "label": "Local Python TTY"}, {"value": "ssh", "label": "SSH"}],
             is_dockerized=runtime.is_dockerized(),
             agent_subdirs=[{"value": subdir, "label": subdir}
@@ -252,25 +265,42 @@ def convert_out(settings: Settings) -> SettingsOutput:
         )
     )
 
-    # ensure dropdown options include currently selected values
+    # ensure dropdown options include currently selected values; the provider lists are
+    # shared with the providers cache, so insert into copies of them
     additional = out["additional"]
     current = out["settings"]
-
-    additional["chat_providers"] = _ensure_option_present(additional.get("chat_providers"), current.get("chat_model_provider"))
-    additional["chat_providers"] = _ensure_option_present(additional.get("chat_providers"), current.get("util_model_provider"))
-    additional["chat_providers"] = _ensure_option_present(additional.get("chat_providers"), current.get("browser_model_provider"))
-    additional["embedding_providers"] = _ensure_option_present(additional.get("embedding_providers"), current.get("embed_model_provider"))
-    additional["shell_interfaces"] = _ensure_option_present(additional.get("shell_interfaces"), current.get("shell_interface"))
-    additional["agent_subdirs"] = _ensure_option_present(additional.get("agent_subdirs"), current.get("agent_profile"))
-    additional["knowledge_subdirs"] = _ensure_option_present(additional.get("knowledge_subdirs"), current.get("agent_knowledge_subdir"))
-    additional["stt_models"] = _ensure_option_present(additional.get("stt_models"), current.get("stt_model_size"))
-
-    # masked api keys
-    providers = get_providers("chat") + get_providers("embedding")
-    for provider in providers:
+    additional["chat_providers"] = list(chat_providers)
+    additional["embedding_providers"] = list(embedding_providers)
+    # values already in each list, built once per list, so checks against the same list
+    # (the chat providers are checked three times) are set lookups instead of scans
+    option_values: dict[str, set] = {}
+    for options_key, setting_key in _SELECTED_OPTION_CHECKS:
+        value = current.get(setting_key)
+        if not value:
+            continue
+        options = additional[options_key]
+        values = option_values.get(options_key)
+        if values is None:
+            values = option_values[options_key] = {o.get("value") for o in options}
+        if value not in values:
+            options.insert(0, {"value": value, "label": value})
+            values.add(value)
+
+    # mask API keys before sending to frontend, including keys only set in dotenv
+    api_keys = settings["api_keys"]
+    masked_keys = {
+        provider: API_KEY_PLACEHOLDER if value else value
+        for provider, value in api_keys.items()
+    }
+    for provider in chat_providers + embedding_providers:
         provider_name = provider["value"]
-        api_key = settings["api_keys"].get(provider_name, models.get_api_key(provider_name))
-        settings["api_keys"][provider_name] = API_KEY_PLACEHOLDER if api_key and api_key != "None" else ""
+        # only look the key up in dotenv when it is not set locally
+        if provider_name in api_keys:
+            api_key = api_keys[provider_name]
+        else:
+            api_key = models.get_api_key(provider_name)
+        masked_keys[provider_name] = API_KEY_PLACEHOLDER if api_key and api_key != "None" else ""
+    out["settings"]["api_keys"] = masked_keys
 
     # load auth from dotenv
     out["settings"]["auth_login"] = dotenv.get_dotenv_value(dotenv.KEY_AUTH_LOGIN) or ""
@@ -291,12 +321,6 @@ def convert_out(settings: Settings) -> SettingsOutput:
     except Exception:
         out["settings"]["secrets"] = ""
 
-    # mask API keys before sending to frontend
-    if isinstance(out["settings"].get("api_keys"), dict):
-        for provider, value in list(out["settings"]["api_keys"].items()):
-            if value:
-                out["settings"]["api_keys"][provider] = API_KEY_PLACEHOLDER
-
     # normalize certain fields
     for key, value in list(out["settings"].items()):
         # convert kwargs dicts to .env format
@@ -306,7 +330,8 @@ def convert_out(settings: Settings) -> SettingsOutput:
 
 
 def _get_api_key_field(settings: Settings, provider: str, title: str) -> SettingsField:
-    key = settings["api_keys"].get(provider, models.get_api_key(provider))
+    api_keys = settings["api_keys"]
+    key = api_keys[provider] if provider in api_keys else models.get_api_key(provider)
     # For API keys, use simple asterisk placeholder for existing keys
     return {
         "id": f"api_key_{provider}",
@@ -350,15 +375,14 @@ def set_settings(settings: Settings, apply: bool = True):
 
 
 def set_settings_delta(delta: dict, apply: bool = True):
+    # get_settings already returns a fresh normalized copy, update it in place
     current = get_settings()
-    new = {**current, **delta}
-    return set_settings(new, apply)  # type: ignore
+    current.update(delta)  # type: ignore
+    return set_settings(current, apply)
 
 
 def merge_settings(original: Settings, delta: dict) -> Settings:
-    merged = original.copy()
-    merged.update(delta)
-    return merged
+    return cast(Settings, {**original, **delta})
 
 
 def normalize_settings(settings: Settings) -> Settings:
@@ -370,22 +394,31 @@ def normalize_settings(settings: Settings) -> Settings:
         _adjust_to_version(copy, default)
         copy["version"] = default["version"]  # sync version
 
-    # remove keys that are not in default
-    keys_to_remove = [key for key in copy if key not in default]
-    for key in keys_to_remove:
-        del copy[key]
+    # remove keys that are not in default (settings already in sync skip this)
+    if copy.keys() != default.keys():
+        copy = cast(Settings, {key: value for key, value in copy.items() if key in default})
 
     # add missing keys and normalize types
     for key, value in default.items():
         if key not in copy:
             copy[key] = value
-        else:
-            try:
-                copy[key] = type(value)(copy[key])  # type: ignore
-                if isinstance(copy[key], str):
-                    copy[key] = copy[key].strip()  # strip strings
-            except (ValueError, TypeError):
-                copy[key] = value  # make default instead
+            continue
+        current = copy[key]
+        value_type = type(value)
+        if type(current) is value_type:
+            # already the right type: only strip strings and copy containers, which is
+            # what the conversion below would do for them
+            if value_type is str:
+                copy[key] = current.strip()  # type: ignore
+            elif value_type is dict or value_type is list:
+                copy[key] = current.copy()  # type: ignore
+            continue
+        try:
+            copy[key] = value_type(current)  # type: ignore
+            if isinstance(copy[key], str):
+                copy[key] = copy[key].strip()  # strip strings
+        except (ValueError, TypeError):
+            copy[key] = value  # make default instead
 
     # mcp server token is set automatically
     copy["mcp_server_token"] = create_auth_token()
@@ -404,6 +437,8 @@ def _adjust_to_version(settings: Settings, default: Settings):
 def _read_settings_file() -> Settings | None:
     if os.path.exists(SETTINGS_FILE):
         content = files.read_file(SETTINGS_FILE)
+        # json, not orjson: the file may hold NaN/Infinity, and orjson would turn ints
+        # beyond 64 bits into floats without an error
         parsed = json.loads(content)
         return normalize_settings(parsed)
 
@@ -413,9 +448,32 @@ def _write_settings_file(settings: Settings):
     _write_sensitive_settings(settings)
     _remove_sensitive_settings(settings)
 
-    # write settings
-    content = json.dumps(settings, indent=4)
-    files.write_file(SETTINGS_FILE, content)
+    # write settings, orjson already produces valid UTF-8 bytes; values orjson cannot
+    # represent (ints beyond 64 bits, NaN/Infinity which it would turn into null) go
+    # through json instead
+    content = None
+    if not _has_non_finite_float(settings):
+        try:
+            content = orjson.dumps(settings, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass
+    if content is None:
+        content = json.dumps(settings, indent=2).encode("utf-8")
+    files.write_file_bin(SETTINGS_FILE, content)
+
+
+def _has_non_finite_float(value: Any) -> bool:
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if item != item or item in (float("inf"), float("-inf")):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
 
 
 def _remove_sensitive_settings(settings: Settings):
@@ -429,19 +487,24 @@ def _remove_sensitive_settings(settings: Settings):
 
 
 def _write_sensitive_settings(settings: Settings):
+    # collect all dotenv changes and write them in one go instead of rewriting .env per key
+    updates: dict[str, str] = {}
     for key, val in settings["api_keys"].items():
         if val != API_KEY_PLACEHOLDER:
-            dotenv.save_dotenv_value(f"API_KEY_{key.upper()}", val)
+            updates[f"API_KEY_{key.upper()}"] = val
 
-    dotenv.save_dotenv_value(dotenv.KEY_AUTH_LOGIN, settings["auth_login"])
+    updates[dotenv.KEY_AUTH_LOGIN] = settings["auth_login"]
     if settings["auth_password"] != PASSWORD_PLACEHOLDER:
-        dotenv.save_dotenv_value(dotenv.KEY_AUTH_PASSWORD, settings["auth_password"])
+        updates[dotenv.KEY_AUTH_PASSWORD] = settings["auth_password"]
     if settings["rfc_password"] != PASSWORD_PLACEHOLDER:
-        dotenv.save_dotenv_value(dotenv.KEY_RFC_PASSWORD, settings["rfc_password"])
-    if settings["root_password"] != PASSWORD_PLACEHOLDER:
-        if runtime.is_dockerized():
-            dotenv.save_dotenv_value(dotenv.KEY_ROOT_PASSWORD, settings["root_password"])
-            set_root_password(settings["root_password"])
+        updates[dotenv.KEY_RFC_PASSWORD] = settings["rfc_password"]
+    set_root = settings["root_password"] != PASSWORD_PLACEHOLDER and runtime.is_dockerized()
+    if set_root:
+        updates[dotenv.KEY_ROOT_PASSWORD] = settings["root_password"]
+
+    dotenv.save_dotenv_values(updates)
+    if set_root:
+        set_root_password(settings["root_password"])
 
     # Handle secrets separately - merge with existing preserving comments/order and support deletions
     secrets_manager = get_default_secrets_manager()
@@ -450,9 +513,47 @@ def _write_sensitive_settings(settings: Settings):
 
 
 
+_defaults_cache: tuple[tuple[int, int | None], Settings] | None = None
+
+
 def get_default_settings() -> Settings:
+    # the environment-derived defaults are rebuilt after .env is reloaded or changed on disk;
+    # version and token are not cached here, they follow the checkout and the credentials
+    global _defaults_cache
+    mtime = _dotenv_mtime()
+    if (
+        _defaults_cache
+        and _defaults_cache[0][1] != mtime
+        and _defaults_cache[0][0] == dotenv.get_dotenv_generation()
+    ):
+        # .env was edited outside of this process, load it as a save from here would
+        dotenv.load_dotenv()
+    cache_key = (dotenv.get_dotenv_generation(), mtime)
+    if not _defaults_cache or _defaults_cache[0] != cache_key:
+        _defaults_cache = (cache_key, _build_default_settings())
+    # copy mutable values so callers cannot change the cached defaults
+    defaults = cast(
+        Settings,
+        {
+            key: value.copy() if isinstance(value, (dict, list)) else value
+            for key, value in _defaults_cache[1].items()
+        },
+    )
+    defaults["version"] = _get_version()
+    defaults["mcp_server_token"] = create_auth_token()
+    return defaults
+
+
+def _dotenv_mtime() -> int | None:
+    try:
+        return os.stat(dotenv.get_dotenv_file_path()).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _build_default_settings() -> Settings:
     return Settings(
-        version=_get_version(),
+        version="",  # set per call in get_default_settings
         chat_model_provider=get_default_value("chat_model_provider", "openrouter"),
         chat_model_name=get_default_value("chat_model_name", "openai/gpt-4.1"),
         chat_model_api_base=get_default_value("chat_model_api_base", ""),
@@ -525,7 +626,7 @@ def get_default_settings() -> Settings:
         mcp_client_init_timeout=get_default_value("mcp_client_init_timeout", 10),
         mcp_client_tool_timeout=get_default_value("mcp_client_tool_timeout", 120),
         mcp_server_enabled=get_default_value("mcp_server_enabled", False),
-        mcp_server_token=create_auth_token(),
+        mcp_server_token="",  # set per call in get_default_settings
         a2a_server_enabled=get_default_value("a2a_server_enabled", False),
         variables="",
         secrets="",
@@ -619,42 +720,48 @@ def _apply_settings(previous: Settings | None):
         )  # TODO - ugly, token in settings is generated from dotenv and does not always correspond
         if not previous or current_token != previous["mcp_server_token"]:
 
-            async def update_mcp_token(token: str):
+            # update token in mcp and a2a servers with one task
+            async def update_server_tokens(token: str):
                 from python.helpers.mcp_server import DynamicMcpProxy
+                from python.helpers.fasta2a_server import DynamicA2AProxy
 
-                DynamicMcpProxy.get_instance().reconfigure(token=token)
+                # independent updates, a failing server must not leave the other on the old token
+                for name, proxy in (("MCP", DynamicMcpProxy), ("A2A", DynamicA2AProxy)):
+                    try:
+                        proxy.get_instance().reconfigure(token=token)
+                    except Exception as e:
+                        PrintStyle().error(f"Failed to update {name} server token: {e}")
 
             task3 = defer.DeferredTask().start_task(
-                update_mcp_token, current_token
+                update_server_tokens, current_token
             )  # TODO overkill, replace with background task
 
-        # update token in a2a server
-        if not previous or current_token != previous["mcp_server_token"]:
 
-            async def update_a2a_token(token: str):
-                from python.helpers.fasta2a_server import DynamicA2AProxy
-
-                DynamicA2AProxy.get_instance().reconfigure(token=token)
-
-            task4 = defer.DeferredTask().start_task(
-                update_a2a_token, current_token
-            )  # TODO overkill, replace with background task
+# one "key = value" line of .env-style text; blank lines, comments and lines without "="
+# do not match, key and value come out stripped
+_ENV_LINE_RE = re.compile(
+    r"""
+    \s*
+    (?:export\s+(?=[^#\s=]))?  # optional shell "export " prefix, only when a key follows
+    ([^#\s=][^=]*?)?           # key: up to the first "=", a leading "#" makes a comment
+    \s*=\s*
+    (.*?)                      # value: the rest of the line, may contain "="
+    \s*
+    """,
+    re.VERBOSE,
+)
 
 
 def _env_to_dict(data: str):
     result = {}
+    # splitlines breaks on every line boundary (\r, \x0b, \x0c, \x85, \u2028, ...)
     for line in data.splitlines():
-        line = line.strip()
-        if not line or line.startswith('#'):
+        match = _ENV_LINE_RE.fullmatch(line)
+        if not match:
             continue
-        
-        if '=' not in line:
-            continue
-            
-        key, value = line.split('=', 1)
-        key = key.strip()
-        value = value.strip()
-        
+        key, value = match.groups()
+        key = key or ""
+
         # If quoted, treat as string
         if value.startswith('"') and value.endswith('"'):
             result[key] = value[1:-1].replace('\\"', '"')  # Unescape quotes
@@ -666,7 +773,7 @@ def _env_to_dict(data: str):
                 result[key] = json.loads(value)
             except (json.JSONDecodeError, ValueError):
                 result[key] = value
-    
+
     return result
 
 
@@ -723,15 +830,24 @@ def get_runtime_config(set: Settings):
         }
 
 
+_token_cache: tuple[tuple[str, str, str], str] | None = None
+
+
 def create_auth_token() -> str:
+    global _token_cache
     runtime_id = runtime.get_persistent_id()
     username = dotenv.get_dotenv_value(dotenv.KEY_AUTH_LOGIN) or ""
     password = dotenv.get_dotenv_value(dotenv.KEY_AUTH_PASSWORD) or ""
+    # the token is derived from these inputs only, reuse it while they are unchanged
+    key = (runtime_id, username, password)
+    if _token_cache and _token_cache[0] == key:
+        return _token_cache[1]
     # use base64 encoding for a more compact token with alphanumeric chars
     hash_bytes = hashlib.sha256(f"{runtime_id}:{username}:{password}".encode()).digest()
     # encode as base64 and remove any non-alphanumeric chars (like +, /, =)
     b64_token = base64.urlsafe_b64encode(hash_bytes).decode().replace("=", "")
-    return b64_token[:16]
+    _token_cache = (key, b64_token[:16])
+    return _token_cache[1]
 
 
 def _get_version():
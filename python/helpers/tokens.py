@@ -1,29 +1,106 @@
+import os
+import re
+from functools import lru_cache
 from typing import Literal
 
 # Heuristic: ~3 characters per token is a safe approximation (usually ~4 for English/Code)
 # This avoids expensive BPE encoding for simple checks
 CHARS_PER_TOKEN = 3
-TRIM_BUFFER = 0.8
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(encoding_name: str):
+    # resolved once per name, so repeated calls skip tiktoken's registry lookup and lock;
+    # only a handful of encodings exist (cl100k_base, o200k_base, p50k_base, r50k_base)
+    import tiktoken
+
+    return tiktoken.get_encoding(encoding_name)
+
+
+def preload_encoding(encoding_name: str = "cl100k_base"):
+    """
+    Loads the tiktoken encoding ahead of time, so its BPE tables are not read (or downloaded)
+    during the first count_tokens or trim_to_tokens call of a user request.
+    """
+    _get_encoding(encoding_name)
+
+
+def clear_encoding_cache():
+    """
+    Drops the cached encodings and memoized token counts, e.g. when tests swap the encoding.
+    """
+    _get_encoding.cache_clear()
+    _count_tokens_cached.cache_clear()
 
 
 def count_tokens(text: str, encoding_name="cl100k_base") -> int:
     """
     Counts the exact number of tokens in a text string using tiktoken.
     This is an O(N) operation where N is the length of the text.
+    Counts of texts up to _COUNT_CACHE_MAX_CHARS characters are memoized.
     """
     if not text:
         return 0
+    if len(text) <= _COUNT_CACHE_MAX_CHARS:
+        return _count_tokens_cached(text, encoding_name)
+    if len(text) > _PARALLEL_MIN_CHARS and encoding_name in _SPLIT_SAFE_ENCODINGS:
+        return _count_tokens_parallel(text, encoding_name)
+    return _count_tokens(text, encoding_name)
 
-    import tiktoken
 
-    # Get the encoding
-    encoding = tiktoken.get_encoding(encoding_name)
+# prompt fragments (system prompts, tool specs, chat turns) are counted over and over;
+# longer texts are rarely repeated and would make the cache keys expensive to hold
+_COUNT_CACHE_MAX_CHARS = 2048
+
+
+@lru_cache(maxsize=512)
+def _count_tokens_cached(text: str, encoding_name: str) -> int:
+    return _count_tokens(text, encoding_name)
+
+
+def _count_tokens(text: str, encoding_name: str) -> int:
+    return len(_encode(text, _get_encoding(encoding_name)))
+
+
+def _encode(text: str, encoding) -> list[int]:
+    # single encode path for counting and trimming; encode_ordinary treats special tokens as
+    # plain text like encode(disallowed_special=()) but skips the special-token checks
+    return encoding.encode_ordinary(text)
+
+
+# Long texts are split into chunks and encoded on tiktoken's thread pool. The pre-tokenizers
+# of these encodings always end a piece at a newline that is followed by a non-whitespace
+# character, so cutting there yields exactly the same tokens as encoding the whole text.
+_PARALLEL_MIN_CHARS = 64 * 1024
+_SPLIT_SAFE_ENCODINGS = frozenset({"cl100k_base", "o200k_base"})
+_SAFE_SPLIT_RE = re.compile(r"\n(?=\S)")
+
+
+def _count_tokens_parallel(text: str, encoding_name: str) -> int:
+    threads = os.cpu_count() or 1
+    chunk_chars = max(_PARALLEL_MIN_CHARS // 4, len(text) // threads)
+    chunks = []
+    start = 0
+    while len(text) - start > chunk_chars:
+        match = _SAFE_SPLIT_RE.search(text, start + chunk_chars)
+        if not match:
+            break
+        chunks.append(text[start : match.end()])
+        start = match.end()
+    chunks.append(text[start:])
+
+    if len(chunks) == 1:
+        return _count_tokens(text, encoding_name)
+    encoding = _get_encoding(encoding_name)
+    batches = encoding.encode_ordinary_batch(chunks, num_threads=threads)
+    return sum(len(tokens) for tokens in batches)
 
-    # Encode the text and count the tokens
-    tokens = encoding.encode(text, disallowed_special=())
-    token_count = len(tokens)
 
-    return token_count
+def _fits_by_length(text: str, max_tokens: int) -> bool:
+    chars = len(text)
+    # every token covers at least one UTF-8 byte, so short texts fit from their length alone;
+    # a character takes at most 4 UTF-8 bytes, an ASCII character exactly 1
+    return chars * 4 <= max_tokens or (chars <= max_tokens and text.isascii())
 
 
 def approximate_tokens(
@@ -35,7 +112,8 @@ def approximate_tokens(
     """
     if not text:
         return 0
-    return approximate_tokens_from_len(len(text))
+    # same as approximate_tokens_from_len, inlined to save a call on this hot path
+    return max(1, len(text) // CHARS_PER_TOKEN)
 
 
 def approximate_tokens_from_len(
@@ -56,17 +134,85 @@ def trim_to_tokens(
     direction: Literal["start", "end"],
     ellipsis: str = "...",
 ) -> str:
-    chars = len(text)
-    # We still use exact count here because trimming needs to be precise enough not to exceed limits
-    # but efficient enough. However, if performance is critical here, we could use heuristic too.
-    # For now, keeping exact count for safety in trimming, as this is likely used for hard limits.
-    tokens = count_tokens(text)
+    if direction == "start":
+        return trim_to_tokens_start(text, max_tokens, ellipsis)
+    return trim_to_tokens_end(text, max_tokens, ellipsis)
+
+
+def trim_to_tokens_start(text: str, max_tokens: int, ellipsis: str = "...") -> str:
+    """
+    Keeps the start of text within max_tokens tokens, appending ellipsis when trimmed.
+    """
+    # short texts fit without tokenizing; longer ones are settled by the window below
+    if _fits_by_length(text, max_tokens):
+        return text
 
-    if tokens <= max_tokens:
+    encoding = _get_encoding("cl100k_base")
+    # Only the kept side of the text matters: encode a window a few times larger than
+    # max_tokens worth of characters and grow it until it holds more than max_tokens tokens or
+    # covers the whole text, so long inputs are not tokenized end to end.
+    window = _initial_window(max_tokens)
+    while True:
+        tokens = _encode(text[:window], encoding)
+        if len(tokens) > max_tokens or window >= len(text):
+            break
+        window *= 2
+
+    if len(tokens) <= max_tokens:
         return text
+    return _join_trimmed(encoding, tokens, max_tokens, ellipsis, "start")
 
-    approx_chars = int(chars * (max_tokens / tokens) * TRIM_BUFFER)
 
-    if direction == "start":
-        return text[:approx_chars] + ellipsis
-    return ellipsis + text[chars - approx_chars : chars]
+def trim_to_tokens_end(text: str, max_tokens: int, ellipsis: str = "...") -> str:
+    """
+    Keeps the end of text within max_tokens tokens, prepending ellipsis when trimmed.
+    """
+    if _fits_by_length(text, max_tokens):
+        return text
+
+    encoding = _get_encoding("cl100k_base")
+    # same growing window as trim_to_tokens_start, taken from the end of the text
+    window = _initial_window(max_tokens)
+    while True:
+        tokens = _encode(text[-window:], encoding)
+        if len(tokens) > max_tokens or window >= len(text):
+            break
+        window *= 2
+
+    if len(tokens) <= max_tokens:
+        return text
+    return _join_trimmed(encoding, tokens, max_tokens, ellipsis, "end")
+
+
+def _initial_window(max_tokens: int) -> int:
+    return max(max_tokens, 1) * CHARS_PER_TOKEN * 2
+
+
+def _trim_budget(encoding, max_tokens: int, ellipsis: str) -> int:
+    # leave room for the ellipsis within max_tokens
+    return max(0, max_tokens - len(_encode(ellipsis, encoding)))
+
+
+def _join_trimmed(
+    encoding,
+    tokens: list[int],
+    max_tokens: int,
+    ellipsis: str,
+    direction: Literal["start", "end"],
+) -> str:
+    # the kept text and the ellipsis can merge into more tokens once encoded together,
+    # so count the final string and keep one token less until it fits
+    budget = _trim_budget(encoding, max_tokens, ellipsis)
+    while True:
+        if direction == "start":
+            result = _decode_trimmed(encoding, tokens[:budget]) + ellipsis
+        else:
+            result = ellipsis + _decode_trimmed(encoding, tokens[len(tokens) - budget :])
+        if budget <= 0 or len(_encode(result, encoding)) <= max_tokens:
+            return result
+        budget -= 1
+
+
+def _decode_trimmed(encoding, tokens: list[int]) -> str:
+    # the cut is exact at a token boundary; a character split by it is dropped
+    return encoding.decode_bytes(tokens).decode("utf-8", errors="ignore")
@@ -2,8 +2,13 @@ import sys
 from unittest.mock import MagicMock
 
 # Mock dependencies to avoid installation issues
-sys.modules["browser_use"] = MagicMock()
-sys.modules["browser_use.llm"] = MagicMock()
-sys.modules["sentence_transformers"] = MagicMock()
-sys.modules["whisper"] = MagicMock()
-sys.modules["python.helpers.call_llm"] = MagicMock()
+_MOCKED_MODULES = (
+    "browser_use",
+    "browser_use.llm",
+    "sentence_transformers",
+    "whisper",
+    "python.helpers.call_llm",
+)
+
+for _name in _MOCKED_MODULES:
+    sys.modules.setdefault(_name, MagicMock())
@@ -0,0 +1,145 @@
+import sys
+import os
+import tempfile
+import unittest
+
+# Add project root to path
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from python.helpers.file_tree import file_tree
+
+
+class FileTreeTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+    def make(self, *paths: str, mtimes: dict[str, int] | None = None):
+        # paths ending with "/" are directories, the rest files
+        for rel in paths:
+            path = os.path.join(self.root, rel)
+            if rel.endswith("/"):
+                os.makedirs(path, exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write("x")
+        for rel, mtime in (mtimes or {}).items():
+            os.utime(os.path.join(self.root, rel), (mtime, mtime))
+
+    def tree(self, **kwargs) -> list[str]:
+        kwargs.setdefault("sort", ("name", "asc"))
+        output = file_tree(self.root, **kwargs)
+        # drop the root banner, it holds the temporary path
+        return output.split("\n")[1:]  # type: ignore[union-attr]
+
+
+class TestIgnorePatterns(FileTreeTestCase):
+    def test_directory_ignored_without_slash_stays_hidden_when_empty(self):
+        # "tmp" is ignored by "*"; "!*/" re-includes only the slashed form, which does not
+        # make the directory itself visible
+        self.make("tmp/", "a.py")
+        self.assertEqual(self.tree(ignore="*\n!*/\n!*.py"), ["└── a.py"])
+
+    def test_negation_re_includes_file(self):
+        self.make("src/app.py", "src/app.log", "src/debug.log", "README.md")
+        self.assertEqual(
+            self.tree(ignore="*.log\n!debug.log"),
+            ["├── src/", "│   ├── app.py", "│   └── debug.log", "└── README.md"],
+        )
+
+    def test_negation_inside_ignored_directory_content(self):
+        self.make("logs/a.txt", "logs/keep", "src/app.py")
+        self.assertEqual(
+            self.tree(ignore="logs/*\n!logs/keep"),
+            ["├── logs/", "│   └── keep", "└── src/", "    └── app.py"],
+        )
+
+    def test_directory_only_pattern_keeps_files_of_same_name(self):
+        self.make("build", "src/build/x.py", "src/a.py")
+        self.assertEqual(
+            self.tree(ignore="build/"),
+            ["├── src/", "│   └── a.py", "└── build"],
+        )
+
+    def test_anchored_directory_pattern(self):
+        self.make("build/out.bin", "docs/build/index.md")
+        self.assertEqual(
+            self.tree(ignore="/build/"),
+            ["└── docs/", "    └── build/", "        └── index.md"],
+        )
+
+
+class TestNestedOutput(FileTreeTestCase):
+    def test_nested_items_follow_the_tree(self):
+        self.make("a/b/c.txt", "a/d.txt", "e.txt")
+        nested = file_tree(self.root, sort=("name", "asc"), output_mode="nested")
+
+        def shape(items):
+            return [(item["name"], item["type"], shape(item["items"] or [])) for item in items]
+
+        self.assertEqual(
+            shape(nested),
+            [
+                ("a", "folder", [("b", "folder", [("c.txt", "file", [])]), ("d.txt", "file", [])]),
+                ("e.txt", "file", []),
+            ],
+        )
+
+
+class TestSortingAndCaps(FileTreeTestCase):
+    MTIMES = {"f1": 100, "f2": 300, "f3": 200, "f4": 300, "f5": 50, "d1": 10, "d2": 30, "d3": 20}
+
+    def setUp(self):
+        super().setUp()
+        self.make("f1", "f2", "f3", "f4", "f5", "d1/", "d2/", "d3/", mtimes=self.MTIMES)
+
+    def test_sorted_by_modified(self):
+        lines = self.tree(sort=("modified", "desc"))
+        self.assertEqual(lines[:3], ["├── d2/", "├── d3/", "├── d1/"])
+        # f2 and f4 share a timestamp, either may come first
+        self.assertEqual(sorted(lines[3:5]), ["├── f2", "├── f4"])
+        self.assertEqual(lines[5:], ["├── f3", "├── f1", "└── f5"])
+
+    def test_capped_groups_keep_the_uncapped_order(self):
+        for sort in [("modified", "desc"), ("modified", "asc"), ("name", "asc"), ("name", "desc")]:
+            full = self.tree(sort=sort)
+            capped = self.tree(sort=sort, max_folders=1, max_files=2)
+            self.assertEqual(
+                capped,
+                [full[0], "├── # 2 more folders", full[3], full[4], "└── # 3 more files"],
+                sort,
+            )
+
+    def test_capped_ties_match_the_full_listing(self):
+        full = self.tree(sort=("modified", "desc"))
+        capped = self.tree(sort=("modified", "desc"), max_files=1)
+        self.assertEqual(capped[3], full[3])
+
+    def test_single_excess_entry_is_summarized(self):
+        self.assertEqual(
+            self.tree(sort=("name", "asc"), max_files=4, max_folders=2),
+            [
+                "├── d1/",
+                "├── d2/",
+                "├── # 1 more folder",
+                "├── f1",
+                "├── f2",
+                "├── f3",
+                "├── f4",
+                "└── # 1 more file",
+            ],
+        )
+
+    def test_files_first(self):
+        self.assertEqual(
+            self.tree(sort=("name", "desc"), max_files=2, folders_first=False),
+            ["├── f5", "├── f4", "├── # 3 more files", "├── d3/", "├── d2/", "└── d1/"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
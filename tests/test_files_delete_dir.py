@@ -0,0 +1,83 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Add project root to path
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from python.helpers import files
+
+
+class TestDeleteDir(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = tmp.name
+        patcher = mock.patch.object(
+            files, "get_abs_path", lambda *paths: os.path.join(self.base, *paths)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.trash = os.path.join(self.base, files.TRASH_FOLDER)
+
+    def make_tree(self, relative_path: str) -> str:
+        path = os.path.join(self.base, relative_path)
+        os.makedirs(os.path.join(path, "sub"))
+        with open(os.path.join(path, "sub", "file.txt"), "w") as f:
+            f.write("content")
+        return path
+
+    def trash_entries(self) -> list[str]:
+        return os.listdir(self.trash) if os.path.isdir(self.trash) else []
+
+    def test_deletes_directory_without_leftovers(self):
+        path = self.make_tree("tmp/chats/a")
+        files.delete_dir("tmp/chats/a")
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(os.listdir(os.path.dirname(path)), [])
+        self.assertEqual(self.trash_entries(), [])
+
+    def test_failed_removal_leaves_entry_only_in_trash(self):
+        path = self.make_tree("tmp/chats/a")
+        with mock.patch.object(files.shutil, "rmtree"):
+            files.delete_dir("tmp/chats/a")
+        self.assertEqual(os.listdir(os.path.dirname(path)), [])
+        self.assertEqual(len(self.trash_entries()), 1)
+
+    def test_falls_back_to_in_place_delete_when_rename_fails(self):
+        path = self.make_tree("tmp/chats/a")
+        with mock.patch.object(files.os, "rename", side_effect=OSError("cross-device")):
+            files.delete_dir("tmp/chats/a")
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.trash_entries(), [])
+
+    def test_falls_back_to_in_place_delete_on_other_drive(self):
+        path = self.make_tree("tmp/chats/a")
+        with mock.patch.object(files.os.path, "commonpath", side_effect=ValueError):
+            files.delete_dir("tmp/chats/a")
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.trash_entries(), [])
+
+    def test_deleting_trash_folder_itself(self):
+        self.make_tree(os.path.join(files.TRASH_FOLDER, "old_1_2"))
+        files.delete_dir(files.TRASH_FOLDER)
+        self.assertFalse(os.path.exists(self.trash))
+
+    def test_sweep_trash_skips_entries_of_this_process(self):
+        other = self.make_tree(os.path.join(files.TRASH_FOLDER, "a_0_1"))
+        own = self.make_tree(os.path.join(files.TRASH_FOLDER, f"b_{os.getpid()}_1"))
+        files.sweep_trash()
+        self.assertFalse(os.path.exists(other))
+        self.assertTrue(os.path.exists(own))
+
+    def test_sweep_trash_without_trash_folder(self):
+        files.sweep_trash()
+        self.assertFalse(os.path.exists(self.trash))
+
+
+if __name__ == "__main__":
+    unittest.main()
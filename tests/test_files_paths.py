@@ -0,0 +1,37 @@
+import sys
+import os
+import pathlib
+import unittest
+from unittest import mock
+
+# Add project root to path
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from python.helpers import files
+
+
+class TestBasename(unittest.TestCase):
+    def test_matches_os_path_basename(self):
+        for path in ["a/b.txt", "/a/b/", "b.txt", "", "/", "a//b"]:
+            self.assertEqual(files.basename(path), os.path.basename(path), path)
+
+    def test_path_like_input(self):
+        self.assertEqual(files.basename(pathlib.Path("a/b.txt")), "b.txt")  # type: ignore
+        self.assertEqual(files.basename(pathlib.PurePosixPath("a/b.md"), ".md"), "b")  # type: ignore
+
+    def test_suffix(self):
+        self.assertEqual(files.basename("a/b.txt", ".txt"), "b")
+        self.assertEqual(files.basename("a/b.txt", ".md"), "b.txt")
+
+    def test_platforms_with_altsep_use_os_path(self):
+        with mock.patch.object(files, "_POSIX_PATHS", False), mock.patch.object(
+            files.os.path, "basename", return_value="b.txt"
+        ) as os_basename:
+            self.assertEqual(files.basename("a\\b.txt"), "b.txt")
+        os_basename.assert_called_once_with("a\\b.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import os
+import unittest
+
+# Add project root to path
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from python.helpers import files
+
+
+class TestEvaluateTextConditions(unittest.TestCase):
+    def test_true_and_false_blocks(self):
+        text = "a{{if x}}b{{endif}}c{{if not x}}d{{endif}}e"
+        self.assertEqual(files.evaluate_text_conditions(text, x=True), "abce")
+        self.assertEqual(files.evaluate_text_conditions(text, x=False), "acde")
+
+    def test_nested_blocks(self):
+        text = "<{{if a}}A{{if b}}B{{endif}}a{{endif}}|{{if b}}b{{endif}}>"
+        self.assertEqual(files.evaluate_text_conditions(text, a=True, b=True), "<ABa|b>")
+        self.assertEqual(files.evaluate_text_conditions(text, a=True, b=False), "<Aa|>")
+        self.assertEqual(files.evaluate_text_conditions(text, a=False, b=True), "<|b>")
+
+    def test_deeply_nested_blocks(self):
+        depth = 200
+        text = "{{if x}}(" * depth + "core" + "){{endif}}" * depth
+        self.assertEqual(
+            files.evaluate_text_conditions(text, x=True),
+            "(" * depth + "core" + ")" * depth,
+        )
+        self.assertEqual(files.evaluate_text_conditions(text, x=False), "")
+
+    def test_unterminated_or_invalid_block_is_kept(self):
+        self.assertEqual(files.evaluate_text_conditions("a{{if x}}b", x=True), "a{{if x}}b")
+        text = "a{{if missing}}b{{endif}}c"
+        self.assertEqual(files.evaluate_text_conditions(text), text)
+
+
+class TestReplacePlaceholdersText(unittest.TestCase):
+    def test_replaces_known_and_keeps_unknown(self):
+        self.assertEqual(
+            files.replace_placeholders_text("{{a}} {{b}}", a=1), "1 {{b}}"
+        )
+
+    def test_keys_that_are_not_identifiers(self):
+        self.assertEqual(
+            files.replace_placeholders_text(
+                "{{a-b}} {{a.b}} {{a b}} {{}}", **{"a-b": 1, "a.b": 2, "a b": 3, "": 4}
+            ),
+            "1 2 3 4",
+        )
+        self.assertEqual(files.replace_placeholders_text("x{{a{b}}y", **{"a{b": 5}), "x5y")
+
+    def test_json_values(self):
+        self.assertEqual(
+            files.replace_placeholders_json('{"v": {{tool-args}}}', **{"tool-args": {"k": [1]}}),
+            '{"v": {"k": [1]}}',
+        )
+
+    def test_values_with_braces_are_inserted_as_is(self):
+        # replacement is a single pass: placeholders inside inserted values are not expanded
+        self.assertEqual(
+            files.replace_placeholders_text("{{a}}|{{b}}", a="{{b}}", b="{x}"),
+            "{{b}}|{x}",
+        )
+        self.assertEqual(
+            files.replace_placeholders_text("{{a}}", a="{{if x}}}}"), "{{if x}}}}"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,35 @@
 import sys
 import os
 import unittest
+from unittest import mock
 
 # Add project root to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from python.helpers.history import Message
 from python.helpers import tokens
 
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover
+    tiktoken = None
+
+
+def _test_encoding():
+    # small offline BPE: every byte is a token, plus a few merges chosen so that some
+    # trimmed texts re-encode into more tokens once the ellipsis is attached
+    ranks = {bytes([i]): i for i in range(256)}
+    for merge in [b"xp", b"cd", b"bc", b"pq", b"pqr", b"abc"]:
+        ranks[merge] = len(ranks)
+    return tiktoken.Encoding(
+        name="test_bpe",
+        pat_str=r"\w+|[^\w\s]+|\s+",
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+
 class TestHistoryTokens(unittest.TestCase):
     def test_calculate_tokens_string(self):
         # Mock content
@@ -38,5 +60,83 @@ class TestHistoryTokens(unittest.TestCase):
         self.assertLessEqual(msg_list.calculate_tokens(), expected_tokens_list)
         self.assertEqual(msg_list.calculate_tokens(), 11)
 
+
+@unittest.skipIf(tiktoken is None, "tiktoken is not installed")
+class TestTrimToTokens(unittest.TestCase):
+    def setUp(self):
+        self.encoding = _test_encoding()
+        patcher = mock.patch.object(tokens, "_get_encoding", return_value=self.encoding)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def count(self, text):
+        return len(self.encoding.encode_ordinary(text))
+
+    def test_short_text_is_unchanged(self):
+        for direction in ("start", "end"):
+            self.assertEqual(tokens.trim_to_tokens("hello", 10, direction), "hello")
+
+    def test_start_keeps_head_and_appends_ellipsis(self):
+        text = "one two three four five six seven eight nine ten"
+        trimmed = tokens.trim_to_tokens(text, 12, "start")
+        self.assertTrue(trimmed.endswith("..."))
+        self.assertTrue(text.startswith(trimmed[:-3]))
+        self.assertLessEqual(self.count(trimmed), 12)
+
+    def test_end_keeps_tail_and_prepends_ellipsis(self):
+        text = "one two three four five six seven eight nine ten"
+        trimmed = tokens.trim_to_tokens(text, 12, "end")
+        self.assertTrue(trimmed.startswith("..."))
+        self.assertTrue(text.endswith(trimmed[3:]))
+        self.assertLessEqual(self.count(trimmed), 12)
+
+    def test_start_stays_within_budget_when_ellipsis_merges(self):
+        # "abc" + "d" re-encodes as a, b, cd: one token more than counted separately
+        trimmed = tokens.trim_to_tokens("abcabcabc", 2, "start", ellipsis="d")
+        self.assertLessEqual(self.count(trimmed), 2)
+        self.assertTrue(trimmed.endswith("d"))
+
+    def test_end_stays_within_budget_when_ellipsis_merges(self):
+        # "x" + "pqr" re-encodes as xp, q, r: one token more than counted separately
+        trimmed = tokens.trim_to_tokens("pppqr", 2, "end", ellipsis="x")
+        self.assertLessEqual(self.count(trimmed), 2)
+        self.assertTrue(trimmed.startswith("x"))
+
+    def test_trim_budget_leaves_room_for_ellipsis(self):
+        self.assertEqual(tokens._trim_budget(self.encoding, 10, "..."), 7)
+        self.assertEqual(tokens._trim_budget(self.encoding, 2, "..."), 0)
+        text = "abc pqr abcd xpqr " * 20
+        for max_tokens in range(3, 40):
+            for direction in ("start", "end"):
+                trimmed = tokens.trim_to_tokens(text, max_tokens, direction)
+                self.assertLessEqual(self.count(trimmed), max_tokens, (max_tokens, direction))
+
+
+@unittest.skipIf(tiktoken is None, "tiktoken is not installed")
+class TestCountTokens(unittest.TestCase):
+    def setUp(self):
+        # counts memoized with another encoding must not leak into or out of these tests
+        tokens.clear_encoding_cache()
+        self.addCleanup(tokens.clear_encoding_cache)
+        self.encoding = _test_encoding()
+        patcher = mock.patch.object(tokens, "_get_encoding", return_value=self.encoding)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_short_texts_are_cached_with_same_count(self):
+        text = "abc pqr abcd xpqr"
+        expected = len(self.encoding.encode_ordinary(text))
+        self.assertEqual(tokens.count_tokens(text), expected)
+        self.assertEqual(tokens.count_tokens(text), expected)
+        info = tokens._count_tokens_cached.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_long_texts_bypass_cache(self):
+        text = "abc " * tokens._COUNT_CACHE_MAX_CHARS
+        expected = len(self.encoding.encode_ordinary(text))
+        self.assertEqual(tokens.count_tokens(text), expected)
+        self.assertEqual(tokens._count_tokens_cached.cache_info().currsize, 0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+import sys
+import os
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+# Add project root to path
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from python.api import poll
+
+_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class _FakeContext:
+    def __init__(self, id: str, minutes: int | None, type=poll.AgentContextType.USER):
+        self.id = id
+        self.type = type
+        self.created_at = _START + timedelta(minutes=minutes) if minutes is not None else None
+        self.log = mock.MagicMock()
+        self.paused = False
+
+    def output(self):
+        return {"id": self.id}
+
+
+class _FakeTask:
+    def __init__(self, context_id: str):
+        self.context_id = context_id
+
+    def is_dedicated(self):
+        return True
+
+
+class TestPoll(unittest.TestCase):
+    def setUp(self):
+        self.contexts: dict[str, _FakeContext] = {}
+        self.tasks: list[_FakeTask] = []
+        scheduler = mock.MagicMock()
+        scheduler.get_tasks.side_effect = lambda: self.tasks
+        for target, attr, value in [
+            (poll.AgentContext, "_contexts", self.contexts),
+            (poll.AgentContext, "get_notification_manager", mock.MagicMock()),
+            (poll.TaskScheduler, "get", lambda: scheduler),
+            (poll, "serialize_task", lambda task: {"type": "adhoc", "context_id": task.context_id}),
+            (poll, "_max_contexts_cache", None),
+        ]:
+            patcher = mock.patch.object(target, attr, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop("MAX_CONTEXTS_PER_POLL", None)
+
+    def add(self, *contexts: _FakeContext):
+        for ctx in contexts:
+            self.contexts[ctx.id] = ctx
+
+    def poll(self, ctxid: str = "") -> dict:
+        handler = poll.Poll(None, None)  # type: ignore[arg-type]
+        handler.use_context = lambda ctxid, create_if_not_exists=False: self.contexts[ctxid]  # type: ignore
+        return asyncio.run(handler.process({"context": ctxid}, None))  # type: ignore[arg-type]
+
+    def ids(self, items: list[dict]) -> list[str]:
+        return [item["id"] for item in items]
+
+    def test_newest_first_and_background_hidden(self):
+        self.add(
+            _FakeContext("old", 1),
+            _FakeContext("new", 3),
+            _FakeContext("mid", 2),
+            _FakeContext("undated", None),
+            _FakeContext("bg", 4, type=poll.AgentContextType.BACKGROUND),
+        )
+        self.assertEqual(self.ids(self.poll()["contexts"]), ["new", "mid", "old", "undated"])
+
+    def test_equal_timestamps_keep_insertion_order(self):
+        self.add(_FakeContext("a", 1), _FakeContext("b", 1), _FakeContext("c", 2))
+        self.assertEqual(self.ids(self.poll()["contexts"]), ["c", "a", "b"])
+
+    def test_tasks_are_listed_separately(self):
+        self.add(_FakeContext("chat", 1), _FakeContext("task", 2))
+        self.tasks.append(_FakeTask("task"))
+        result = self.poll()
+        self.assertEqual(self.ids(result["contexts"]), ["chat"])
+        self.assertEqual(self.ids(result["tasks"]), ["task"])
+        self.assertEqual(result["tasks"][0]["token"], None)
+
+    def test_cap_keeps_newest_and_the_active_context(self):
+        self.add(*(_FakeContext(f"c{i}", i) for i in range(5)))
+        os.environ["MAX_CONTEXTS_PER_POLL"] = "2"
+        self.assertEqual(self.ids(self.poll()["contexts"]), ["c4", "c3"])
+        self.assertEqual(self.ids(self.poll("c0")["contexts"]), ["c4", "c3", "c0"])
+
+    def test_invalid_cap_means_no_cap(self):
+        self.add(*(_FakeContext(f"c{i}", i) for i in range(3)))
+        os.environ["MAX_CONTEXTS_PER_POLL"] = "many"
+        self.assertEqual(self.ids(self.poll()["contexts"]), ["c2", "c1", "c0"])
+
+    def test_cap_is_read_again_after_dotenv_reload(self):
+        self.add(*(_FakeContext(f"c{i}", i) for i in range(3)))
+        self.assertEqual(len(self.poll()["contexts"]), 3)
+        os.environ["MAX_CONTEXTS_PER_POLL"] = "1"
+        # unchanged until .env is reloaded
+        self.assertEqual(len(self.poll()["contexts"]), 3)
+        with mock.patch.object(poll.dotenv, "get_dotenv_generation", return_value=-1):
+            self.assertEqual(self.ids(self.poll()["contexts"]), ["c2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import sys
+import os
+import unittest
+from unittest import mock
+
+# Add project root to path
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from python.helpers import settings
+
+
+_CHAT_PROVIDERS = [{"value": "openai", "label": "OpenAI"}, {"value": "other", "label": "Other"}]
+
+
+class TestConvertOut(unittest.TestCase):
+    def setUp(self):
+        for target, attr, value in [
+            (settings, "get_providers", lambda kind: list(_CHAT_PROVIDERS) if kind == "chat" else []),
+            (settings.runtime, "is_dockerized", lambda: False),
+            (settings.files, "get_subdirectories", lambda *args, **kwargs: ["agent0"]),
+            (settings.models, "get_api_key", lambda provider: ""),
+            (settings, "get_default_secrets_manager", mock.MagicMock()),
+        ]:
+            patcher = mock.patch.object(target, attr, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def convert(self, **values):
+        current = {"api_keys": {}, "agent_profile": "agent0", **values}
+        return settings.convert_out(current)  # type: ignore
+
+    def test_missing_selected_providers_are_added_once_in_front(self):
+        out = self.convert(
+            chat_model_provider="custom",
+            util_model_provider="openai",
+            browser_model_provider="custom",
+        )
+        self.assertEqual(
+            [o["value"] for o in out["additional"]["chat_providers"]],
+            ["custom", "openai", "other"],
+        )
+
+    def test_listed_values_leave_options_unchanged(self):
+        out = self.convert(chat_model_provider="other", shell_interface="ssh")
+        self.assertEqual(out["additional"]["chat_providers"], _CHAT_PROVIDERS)
+        self.assertEqual(
+            [o["value"] for o in out["additional"]["shell_interfaces"]], ["local", "ssh"]
+        )
+
+    def test_provider_list_is_not_modified(self):
+        providers = list(_CHAT_PROVIDERS)
+        with mock.patch.object(settings, "get_providers", lambda kind: providers):
+            self.convert(chat_model_provider="custom")
+        self.assertEqual(providers, _CHAT_PROVIDERS)
+
+
+if __name__ == "__main__":
+    unittest.main()
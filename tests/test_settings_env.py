@@ -0,0 +1,63 @@
+import sys
+import os
+import unittest
+
+# Add project root to path
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from python.helpers.settings import _env_to_dict, _dict_to_env
+
+
+class TestEnvToDict(unittest.TestCase):
+    def test_quoted_values(self):
+        data = "A=\"x y\"\nB='it\\'s'\nC=\"say \\\"hi\\\"\"\nD=\"42\""
+        self.assertEqual(
+            _env_to_dict(data),
+            {"A": "x y", "B": "it's", "C": 'say "hi"', "D": "42"},
+        )
+
+    def test_unquoted_values_are_parsed_as_json(self):
+        data = 'A=42\nB=true\nC={"k": [1, 2]}\nD=null\nE=plain text\nF='
+        self.assertEqual(
+            _env_to_dict(data),
+            {"A": 42, "B": True, "C": {"k": [1, 2]}, "D": None, "E": "plain text", "F": ""},
+        )
+
+    def test_equals_inside_values(self):
+        data = 'URL=https://x.test/?a=1&b=2\nQ="k=v"'
+        self.assertEqual(
+            _env_to_dict(data), {"URL": "https://x.test/?a=1&b=2", "Q": "k=v"}
+        )
+
+    def test_whitespace_around_key_and_value_is_stripped(self):
+        data = "  User-Agent  =  agent/1.0  \r\nB = 1\r\n"
+        self.assertEqual(_env_to_dict(data), {"User-Agent": "agent/1.0", "B": 1})
+
+    def test_all_line_boundaries_split_lines(self):
+        data = "A=1\rB=2\x0bC=3\x0cD=4\x85E=5\u2028F=6\r\nG=7"
+        self.assertEqual(
+            _env_to_dict(data),
+            {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7},
+        )
+
+    def test_carriage_return_line_endings(self):
+        data = "# comment\rA=\"x\"\r\rexport B = 2\r"
+        self.assertEqual(_env_to_dict(data), {"A": "x", "B": 2})
+
+    def test_export_prefix(self):
+        data = "export A=1\nexport  B = \"x\"\nexport=2\nexport C"
+        self.assertEqual(_env_to_dict(data), {"A": 1, "B": "x", "export": 2})
+
+    def test_comments_blank_lines_and_lines_without_equals_are_skipped(self):
+        data = "# A=1\n   # B=2\n\nnot a pair\nC=3 # not a comment"
+        self.assertEqual(_env_to_dict(data), {"C": "3 # not a comment"})
+
+    def test_round_trip(self):
+        values = {"s": 'a "q" = b', "n": None, "b": False, "d": {"x": [1, "y"]}, "i": 7}
+        self.assertEqual(_env_to_dict(_dict_to_env(values)), values)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import sys
+import os
+import math
+import tempfile
+import unittest
+from unittest import mock
+
+# Add project root to path
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from python.helpers import settings
+
+
+class TestSettingsFile(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "settings.json")
+        for target, value in [
+            ("SETTINGS_FILE", self.path),
+            ("normalize_settings", lambda parsed: parsed),
+        ]:
+            patcher = mock.patch.object(settings, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write(self, content: str):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_reads_ints_beyond_64_bits_exactly(self):
+        big = 123456789012345678901234
+        self.write('{"chat_model_kwargs": {"seed": %d}}' % big)
+        kwargs = settings._read_settings_file()["chat_model_kwargs"]  # type: ignore
+        self.assertEqual(kwargs["seed"], big)
+        self.assertIsInstance(kwargs["seed"], int)
+
+    def test_reads_values_outside_orjson_range(self):
+        big = 123456789012345678901234
+        self.write(
+            '{"chat_model_kwargs": {"seed": %d, "a": NaN, "b": Infinity}}' % big
+        )
+        kwargs = settings._read_settings_file()["chat_model_kwargs"]  # type: ignore
+        self.assertEqual(kwargs["seed"], big)
+        self.assertTrue(math.isnan(kwargs["a"]))
+        self.assertEqual(kwargs["b"], math.inf)
+
+    def write_settings(self, values: dict):
+        with mock.patch.object(settings, "_write_sensitive_settings"):
+            settings._write_settings_file(values)  # type: ignore
+
+    def test_writes_ints_beyond_64_bits(self):
+        big = 123456789012345678901234
+        self.write_settings({"chat_model_kwargs": {"seed": big}})
+        kwargs = settings._read_settings_file()["chat_model_kwargs"]  # type: ignore
+        self.assertEqual(kwargs["seed"], big)
+
+    def test_writes_non_finite_floats_unchanged(self):
+        self.write_settings({"chat_model_kwargs": {"a": math.nan, "b": [-math.inf]}})
+        kwargs = settings._read_settings_file()["chat_model_kwargs"]  # type: ignore
+        self.assertTrue(math.isnan(kwargs["a"]))
+        self.assertEqual(kwargs["b"], [-math.inf])
+
+    def test_round_trip(self):
+        values = {"agent_profile": "agent0", "chat_model_kwargs": {"temperature": 0.5}}
+        self.write_settings(values)
+        read = settings._read_settings_file()
+        self.assertEqual({key: read[key] for key in values}, values)  # type: ignore
+        self.assertEqual(read["api_keys"], {})  # type: ignore
+
+
+class TestDefaultSettings(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.env_path = os.path.join(tmp.name, ".env")
+        self.write_env("")
+        self.version = "v1"
+        for target, attr, value in [
+            (settings.dotenv, "get_dotenv_file_path", lambda: self.env_path),
+            (settings, "_get_version", lambda: self.version),
+            (settings, "_defaults_cache", None),
+        ]:
+            patcher = mock.patch.object(target, attr, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # a known runtime id keeps create_auth_token from saving a new one to .env
+        patcher = mock.patch.dict(os.environ, {"A0_PERSISTENT_RUNTIME_ID": "test-id"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_env(self, content: str):
+        with open(self.env_path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_version_is_not_frozen_by_the_cache(self):
+        self.assertEqual(settings.get_default_settings()["version"], "v1")
+        self.version = "v2"
+        self.assertEqual(settings.get_default_settings()["version"], "v2")
+
+    def test_external_dotenv_edit_is_picked_up(self):
+        settings.get_default_settings()
+        self.write_env("A0_SET_chat_model_name=from-env\n")
+        os.utime(self.env_path, ns=(1, 1))
+        self.assertEqual(settings.get_default_settings()["chat_model_name"], "from-env")
+
+    def test_defaults_are_cached_and_copied(self):
+        first = settings.get_default_settings()
+        first["chat_model_kwargs"]["changed"] = True
+        with mock.patch.object(settings, "_build_default_settings") as build:
+            second = settings.get_default_settings()
+        build.assert_not_called()
+        self.assertNotIn("changed", second["chat_model_kwargs"])
+
+
+if __name__ == "__main__":
+    unittest.main()